@@ -9,6 +9,49 @@ UPLOAD_FOLDER = 'uploads'
 MAX_CONTENT_LENGTH = 32 * 1024 * 1024  # 32MB max file size
 ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls', 'json'}
 
+# Memory budget for the shared cache of parsed datasets
+DATASET_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256MB
+
+# CSV uploads at or above this size are profiled in streamed row batches
+CHUNKED_INGEST_THRESHOLD = 20 * 1024 * 1024  # 20MB
+INGEST_CHUNKSIZE = 50_000  # rows per batch
+
+# Largest page of rows returned by /viz/data when paging
+DATA_PAGE_MAX_ROWS = 10_000
+
+# Store loaded frames with compact dtypes: strings with at most this ratio of
+# distinct values become categoricals, integers are narrowed when lossless
+OPTIMIZE_DTYPES = True
+CATEGORY_MAX_RATIO = 0.5
+
+# Box/violin previews above this many rows use precomputed summary traces
+DISTRIBUTION_SUMMARY_THRESHOLD = 5_000
+
+# Memory budget for compressed preview/data/list response bodies
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64MB
+
+# Background jobs: uploads at or above the threshold are processed off-request
+ASYNC_UPLOAD_THRESHOLD = 10 * 1024 * 1024  # 10MB
+JOB_WORKERS = 2
+JOB_RETENTION_SECONDS = 60 * 60
+JOB_TIMEOUT_SECONDS = 30 * 60  # Unfinished jobs silent this long are reported as failed
+
+# Storage ledger: rebuild from the files on disk at most this often
+STORAGE_RECONCILE_SECONDS = 60 * 60
+# Upload bookings older than this are dropped by the rebuild as abandoned
+STORAGE_RESERVATION_SECONDS = 6 * 60 * 60
+
+# Server-side export of saved visualizations (PNG/SVG need kaleido); results
+# are cached under static/exports
+EXPORT_WORKERS = 2
+EXPORT_TIMEOUT_SECONDS = 30
+EXPORT_MAX_DIMENSION = 4000  # pixels
+EXPORT_HTML_PLOTLYJS = True  # Inline plotly.js so HTML exports work offline; 'cdn' for smaller files
+
+# Home dashboard and /api/stats data are reused for this long unless a
+# visualization or dataset is saved or deleted first
+DASHBOARD_CACHE_SECONDS = 30
+
 # Plotly configuration
 PLOTLY_CONFIG = {
     'responsive': True,
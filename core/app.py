@@ -3,9 +3,15 @@ import os
 import logging
 from datetime import datetime
 from flask import Flask, render_template, send_from_directory, jsonify
-from sqlalchemy import desc
-from core.visualizations.routes import viz_bp
-from core.models import db, init_db, Visualization, Dataset
+from core.visualizations.routes import viz_bp, storage_directories, sync_thumbnails, sync_upload_catalog, thumbnail_url
+from core.models import db, init_db
+from core.data.cache import dataset_cache, init_dataset_cache
+from core.visualizations.http_cache import init_response_cache
+from core.data.jobs import job_manager
+from core.visualizations.export import export_renderer
+from core.visualizations.report import report_command
+from core.visualizations.dashboard import dashboard_cache, dashboard_stats, dashboard_summary
+from core.data.quota import reconcile_due, reconcile_storage
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -26,27 +32,36 @@ def create_app(config_name="config.default"):
     
     # Initialize database
     init_db(app)
+    init_dataset_cache(app)
+    init_response_cache(app)
+    job_manager.init_app(app)
+    export_renderer.init_app(app)
+    dashboard_cache.init_app(app)
     
     # Register the visualization blueprint
     app.register_blueprint(viz_bp, url_prefix='/viz')
+    app.cli.add_command(report_command)
     
-    # Home route with dashboard
+    # Catalog uploads that predate the dataset table, then rebuild the
+    # storage ledger if that changed anything or it is overdue, and draw
+    # thumbnails missing from older visualizations
+    with app.app_context():
+        added = sync_upload_catalog()
+        if added or reconcile_due(app.config.get('STORAGE_RECONCILE_SECONDS', 60 * 60)):
+            reconcile_storage(
+                storage_directories(),
+                app.config.get('STORAGE_RESERVATION_SECONDS', 6 * 60 * 60)
+            )
+        sync_thumbnails()
+    
+    app.jinja_env.globals['thumbnail_url'] = thumbnail_url
+    
+    # Home route with dashboard (summary projections, cached briefly)
     @app.route('/')
     def home():
-        # Get recent visualizations
-        recent_vizs = Visualization.query.filter_by(is_template=False).order_by(desc(Visualization.updated_at)).limit(5).all()
-        
-        # Get template visualizations
-        templates = Visualization.query.filter_by(is_template=True).all()
-        
-        # Get recent datasets
-        recent_datasets = Dataset.query.order_by(desc(Dataset.last_used)).limit(5).all()
-        
         return render_template(
             'index.html',
-            recent_vizs=[viz.to_dict() for viz in recent_vizs],
-            templates=[viz.to_dict() for viz in templates],
-            recent_datasets=[ds.to_dict() for ds in recent_datasets],
+            **dashboard_summary(),
             plotly_config=app.config.get('PLOTLY_CONFIG', {})
         )
 
@@ -54,29 +69,7 @@ def create_app(config_name="config.default"):
     def get_stats():
         """Get system statistics for the dashboard"""
         try:
-            total_vizs = Visualization.query.filter_by(is_template=False).count()
-            total_datasets = Dataset.query.count()
-            recent_activity = (
-                Visualization.query
-                .filter_by(is_template=False)
-                .order_by(desc(Visualization.updated_at))
-                .limit(10)
-                .all()
-            )
-            
-            return jsonify({
-                'total_visualizations': total_vizs,
-                'total_datasets': total_datasets,
-                'recent_activity': [
-                    {
-                        'id': v.id,
-                        'name': v.name,
-                        'type': v.chart_type,
-                        'updated_at': v.updated_at.isoformat(),
-                    }
-                    for v in recent_activity
-                ]
-            })
+            return jsonify(dashboard_stats())
         except Exception as e:
             logger.error(f"Error getting stats: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
@@ -101,7 +94,8 @@ def create_app(config_name="config.default"):
                 if k not in ['SECRET_KEY'] and not k.startswith('_')
             },
             'database_tables': [str(t) for t in db.metadata.tables.keys()],
-            'registered_blueprints': [str(bp) for bp in app.blueprints.keys()]
+            'registered_blueprints': [str(bp) for bp in app.blueprints.keys()],
+            'dataset_cache': dataset_cache.stats()
         }
 
     return app
\ No newline at end of file
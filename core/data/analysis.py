@@ -0,0 +1,90 @@
+"""Persisted dataset analyses, recomputed in the background when a file changes"""
+
+import json
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from core.models import db, DatasetAnalysis
+from core.data.cache import file_version
+from core.data.dtypes import memory_report
+from core.data.jobs import Job, job_manager
+from core.visualizations.helpers import get_column_stats
+
+_pending: Dict[Tuple[int, str], Job] = {}
+_pending_lock = threading.Lock()
+
+
+def analysis_version(file_path: str) -> str:
+    """Version key for the analysis of a file: its mtime and size"""
+    _, mtime_ns, size = file_version(file_path)
+    return f"{mtime_ns}-{size}"
+
+
+def compute_analysis(df: pd.DataFrame) -> Dict[str, Any]:
+    """Full statistics shown on the analyze page"""
+    column_stats = get_column_stats(df)
+    numeric = df.select_dtypes(include=['number'])
+    return {
+        'row_count': len(df),
+        'column_count': len(df.columns),
+        'memory_usage': int(df.memory_usage(deep=True).sum()),
+        'memory': memory_report(df),
+        'column_stats': column_stats,
+        'missing_data': {col: stats['missing'] for col, stats in column_stats.items()},
+        'correlation': numeric.corr().to_dict() if not numeric.empty else {}
+    }
+
+
+def latest_analysis(dataset_id: int) -> Optional[DatasetAnalysis]:
+    """Most recently computed analysis of a dataset, whatever its version"""
+    return (
+        DatasetAnalysis.query.filter_by(dataset_id=dataset_id)
+        .order_by(DatasetAnalysis.computed_at.desc())
+        .first()
+    )
+
+
+def store_analysis(dataset_id: int, version: str, results: Dict[str, Any]) -> DatasetAnalysis:
+    """Save results for version, replacing analyses of older versions"""
+    DatasetAnalysis.query.filter_by(dataset_id=dataset_id).delete()
+    analysis = DatasetAnalysis(
+        dataset_id=dataset_id,
+        version=version,
+        results=json.dumps(results, default=str),
+        computed_at=datetime.utcnow()
+    )
+    db.session.add(analysis)
+    db.session.commit()
+    return analysis
+
+
+def run_analysis(job: Job, dataset_id: int, version: str, load: Callable[[], pd.DataFrame]) -> Dict[str, Any]:
+    """Job body: load the dataset, analyze it and persist the results"""
+    job.report(10, 'loading')
+    df = load()
+    job.report(50, 'analyzing')
+    results = compute_analysis(df)
+    job.report(90, 'saving')
+    store_analysis(dataset_id, version, results)
+    return {'dataset_id': dataset_id, 'version': version}
+
+
+def schedule_analysis(dataset_id: int, file_path: str, load: Callable[[], pd.DataFrame]) -> Job:
+    """
+    Queue a background analysis of the file's current version, reusing the
+    job already queued or running for that version if there is one.
+    """
+    version = analysis_version(file_path)
+    key = (dataset_id, version)
+    with _pending_lock:
+        job = _pending.get(key)
+        if job is not None and job.status in ('queued', 'running'):
+            return job
+        job = job_manager.submit('analysis', run_analysis, dataset_id, version, load)
+        _pending[key] = job
+        for stale in [k for k, j in _pending.items() if j.status in ('succeeded', 'failed') and k != key]:
+            del _pending[stale]
+        return job
@@ -0,0 +1,118 @@
+"""Process-wide cache of parsed DataFrames"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256MB
+
+
+def file_version(filepath: str) -> Tuple[str, int, int]:
+    """Identify a file's current contents by path, mtime and size"""
+    st = os.stat(filepath)
+    return os.path.abspath(filepath), st.st_mtime_ns, st.st_size
+
+
+class DatasetCache:
+    """
+    Size-aware LRU cache of DataFrames keyed by file version.
+
+    Entries are keyed by (path, mtime, size) plus an optional variant (for
+    example a column projection), so a rewritten file never serves stale
+    data. Cached frames are shared between requests and must be treated
+    as read-only by callers.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(
+        self,
+        filepath: str,
+        loader: Callable[[], pd.DataFrame],
+        variant: Optional[Hashable] = None
+    ) -> pd.DataFrame:
+        """Return the cached frame for filepath, calling loader on a miss"""
+        key = (*file_version(filepath), variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Parse outside the lock so other files can be served meanwhile
+        df = loader()
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return df
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (df, size)
+                self.current_bytes += size
+                self._evict()
+        return df
+
+    def peek(self, filepath: str, variant: Optional[Hashable] = None) -> Optional[pd.DataFrame]:
+        """Return the cached frame for filepath if present, without loading"""
+        key = (*file_version(filepath), variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def invalidate(self, filepath: str) -> int:
+        """Drop every cached entry for filepath; returns the number removed"""
+        path = os.path.abspath(filepath)
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == path]
+            for key in stale:
+                self.current_bytes -= self._entries.pop(key)[1]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory usage for diagnostics"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until within the memory budget"""
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+
+
+dataset_cache = DatasetCache()
+
+
+def init_dataset_cache(app) -> None:
+    """Apply the configured memory budget to the shared dataset cache"""
+    dataset_cache.max_bytes = app.config.get('DATASET_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
@@ -0,0 +1,59 @@
+"""Content-addressed storage of uploaded data files"""
+
+import os
+import hashlib
+import tempfile
+from typing import BinaryIO, Optional, Tuple
+
+from core.models import Dataset
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+DIGEST_PREFIX = 12  # Hex digits of the digest kept in stored filenames
+
+
+def save_hashed(stream: BinaryIO, directory: str) -> Tuple[str, str, int]:
+    """
+    Stream an upload into a temporary file in directory, hashing as it goes.
+    Returns (temp_path, sha256 hex digest, size); the caller moves or removes
+    the temporary file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    return temp_path, digest.hexdigest(), size
+
+
+def hash_file(filepath: str) -> str:
+    """sha256 hex digest of a file already on disk"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_filename(original_filename: str, digest: str) -> str:
+    """
+    Stored name for an upload: the original stem plus a digest prefix, so
+    identical files share a name and different files never collide.
+    """
+    stem, ext = os.path.splitext(original_filename)
+    return f"{stem}-{digest[:DIGEST_PREFIX]}{ext.lower()}"
+
+
+def find_duplicate(digest: str, directory: str) -> Optional[Dataset]:
+    """Catalog entry with identical content whose file is still in directory"""
+    for dataset in Dataset.query.filter_by(content_hash=digest).order_by(Dataset.column_info.is_(None)):
+        if os.path.isfile(os.path.join(directory, dataset.filename)):
+            return dataset
+    return None
@@ -0,0 +1,75 @@
+"""Memory-saving dtype conversion for loaded DataFrames"""
+
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+from flask import current_app
+
+DEFAULT_CATEGORY_RATIO = 0.5  # Max distinct/non-missing ratio for category conversion
+MIN_CATEGORY_ROWS = 50  # Smaller frames gain nothing from categoricals
+
+
+def optimize_dtypes(df: pd.DataFrame, category_ratio: float = DEFAULT_CATEGORY_RATIO) -> pd.DataFrame:
+    """
+    Return df with low-cardinality strings as 'category' and integers in the
+    smallest dtype that holds every value. Floats stay float64: even when
+    every value survives float32, sums and means computed in float32 drift.
+    """
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series) and series.dtype.itemsize > 1:
+            narrowed = pd.to_numeric(series, downcast='integer')
+            if narrowed.dtype != series.dtype:
+                converted[col] = narrowed
+        elif series.dtype == np.float32:
+            # Sidecars written by earlier versions hold narrowed floats; widening is exact
+            converted[col] = series.astype(np.float64)
+        elif pd.api.types.is_object_dtype(series) and len(series) >= MIN_CATEGORY_ROWS:
+            present = series.count()
+            if present and series.nunique() / present <= category_ratio \
+                    and pd.api.types.infer_dtype(series, skipna=True) == 'string':
+                converted[col] = series.astype('category')
+    return df.assign(**converted) if converted else df
+
+
+def optimize_loaded(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply optimize_dtypes to a freshly loaded frame when OPTIMIZE_DTYPES is on"""
+    if not current_app.config.get('OPTIMIZE_DTYPES', True):
+        return df
+    return optimize_dtypes(df, current_app.config.get('CATEGORY_MAX_RATIO', DEFAULT_CATEGORY_RATIO))
+
+
+def unoptimized_memory(df: pd.DataFrame) -> int:
+    """
+    Bytes df would use with pandas' default parse dtypes (object strings,
+    64-bit numerics), for comparing against an optimized frame.
+    """
+    total = int(df.index.memory_usage(deep=True))
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            total += int(series.astype(object).memory_usage(deep=True, index=False))
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            total += len(series) * 8
+        else:
+            total += int(series.memory_usage(deep=True, index=False))
+    return total
+
+
+def memory_report(df: pd.DataFrame) -> Dict[str, Any]:
+    """Current vs default-dtype memory usage and the narrowed columns"""
+    after = int(df.memory_usage(deep=True).sum())
+    before = unoptimized_memory(df)
+    return {
+        'before': before,
+        'after': after,
+        'saved_percent': round(100 * (1 - after / before), 1) if before else 0.0,
+        'optimized_columns': {
+            col: str(dtype) for col, dtype in df.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype) or dtype in (np.int8, np.int16, np.int32)
+        }
+    }
@@ -0,0 +1,94 @@
+"""Streaming, read-only access to Excel workbooks"""
+
+from itertools import islice
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+try:
+    import openpyxl
+except ImportError:  # Fall back to pandas for everything
+    openpyxl = None
+
+
+def is_streamable(filepath: str) -> bool:
+    """Whether the workbook can be read row by row (.xlsx via openpyxl)"""
+    return openpyxl is not None and filepath.lower().endswith(('.xlsx', '.xlsm'))
+
+
+def list_sheets(filepath: str) -> List[str]:
+    """Sheet names, read from the workbook index without loading any cells"""
+    if is_streamable(filepath):
+        workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    with pd.ExcelFile(filepath) as workbook:
+        return list(workbook.sheet_names)
+
+
+def _header_names(values: Sequence[Any]) -> List[str]:
+    """Column names as pandas would derive them: 'Unnamed: i' for blanks, '.n' for repeats"""
+    names, seen = [], {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None or value == '' else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _trim(row: Tuple[Any, ...], width: int) -> Tuple[Any, ...]:
+    """Pad or cut a row to the header width"""
+    if len(row) >= width:
+        return row[:width]
+    return row + (None,) * (width - len(row))
+
+
+def iter_sheet_rows(workbook, sheet: Optional[str]) -> Iterator[Tuple[Any, ...]]:
+    """Cell values of a sheet (the first one by default), row by row"""
+    worksheet = workbook[sheet] if sheet is not None else workbook.worksheets[0]
+    return worksheet.iter_rows(values_only=True)
+
+
+def read_excel_rows(
+    filepath: str,
+    sheet: Optional[str] = None,
+    nrows: Optional[int] = None,
+    usecols: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """
+    Read a sheet into a DataFrame, treating the first row as the header.
+    Rows are streamed, so with nrows only the first nrows data rows are ever
+    parsed; nrows=0 reads just the header. Trailing blank rows are dropped.
+    """
+    if not is_streamable(filepath):
+        return pd.read_excel(filepath, sheet_name=sheet or 0, nrows=nrows, usecols=usecols)
+
+    workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+    try:
+        rows = iter_sheet_rows(workbook, sheet)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        while header and header[-1] is None:
+            header = header[:-1]
+        columns = _header_names(header)
+        width = len(columns)
+        body = [_trim(row, width) for row in (islice(rows, nrows) if nrows is not None else rows)]
+    finally:
+        workbook.close()
+
+    while body and all(value is None for value in body[-1]):
+        body.pop()
+    df = pd.DataFrame(body, columns=columns)
+    if usecols is not None:
+        missing = [col for col in usecols if col not in df.columns]
+        if missing:
+            raise ValueError(f"Usecols do not match columns, columns expected but not found: {missing}")
+        df = df[list(usecols)]
+    return df
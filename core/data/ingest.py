@@ -0,0 +1,137 @@
+"""Streaming ingestion of large CSV files with online column statistics"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.visualizations.helpers import column_type_label
+
+DEFAULT_CHUNKSIZE = 50_000
+SAMPLE_SIZE = 10_000  # Reservoir size per column, used for the approximate median
+SKETCH_SIZE = 2_048  # Hashes kept per column for the approximate distinct count
+SAMPLE_VALUES = 5
+
+
+class ColumnProfile:
+    """
+    Incrementally accumulates statistics for one column across row batches.
+
+    Memory is bounded per column: a bottom-k reservoir of SAMPLE_SIZE values
+    (uniform sample for the median and sample values) and a k-minimum-values
+    sketch of SKETCH_SIZE hashes (distinct-count estimate).
+    """
+
+    def __init__(self, seed: int = 0):
+        self.rng = np.random.default_rng(seed)
+        self.dtype: Optional[np.dtype] = None
+        self.count = 0
+        self.missing = 0
+        self.numeric = True
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.sample = pd.Series(dtype=object)
+        self.sample_keys = np.empty(0)
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, series: pd.Series) -> None:
+        """Fold one batch of values into the running statistics"""
+        self._merge_dtype(series)
+        values = series.dropna()
+        self.count += len(series)
+        self.missing += len(series) - len(values)
+        if values.empty:
+            return
+
+        if self.numeric:
+            self.total += float(values.sum())
+            low, high = float(values.min()), float(values.max())
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+
+        # Bottom-k sampling: keep the values with the k smallest random keys
+        keys = np.concatenate([self.sample_keys, self.rng.random(len(values))])
+        pool = pd.concat([self.sample, values.astype(object)], ignore_index=True)
+        if len(keys) > SAMPLE_SIZE:
+            keep = np.argpartition(keys, SAMPLE_SIZE)[:SAMPLE_SIZE]
+            keys, pool = keys[keep], pool.iloc[keep].reset_index(drop=True)
+        self.sample_keys, self.sample = keys, pool
+
+        # K-minimum-values sketch over value hashes
+        hashes = np.union1d(self.hashes, pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy())
+        self.hashes = hashes[:SKETCH_SIZE]
+
+    def _merge_dtype(self, series: pd.Series) -> None:
+        """Track the dtype pandas would infer for the whole column"""
+        dtype = series.dtype
+        if series.isna().all():
+            # An all-missing batch parses as float64 and says nothing about the type,
+            # except that integer columns with missing values parse as float64
+            dtype = self.dtype if self.dtype is not None else dtype
+            if dtype.kind in 'iu':
+                dtype = np.dtype(np.float64)
+        if self.dtype is None or self.dtype == dtype:
+            self.dtype = dtype
+        elif pd.api.types.is_numeric_dtype(self.dtype) and pd.api.types.is_numeric_dtype(dtype) \
+                and not pd.api.types.is_bool_dtype(self.dtype) and not pd.api.types.is_bool_dtype(dtype):
+            self.dtype = np.result_type(self.dtype, dtype)
+        else:
+            self.dtype = np.dtype(object)
+        if not pd.api.types.is_numeric_dtype(self.dtype):
+            self.numeric = False
+
+    def unique_estimate(self) -> int:
+        """Exact distinct count below SKETCH_SIZE, KMV estimate above it"""
+        if len(self.hashes) < SKETCH_SIZE:
+            return len(self.hashes)
+        kth = float(self.hashes[-1]) / float(np.iinfo(np.uint64).max)
+        return int((SKETCH_SIZE - 1) / kth)
+
+    def to_stats(self) -> Dict[str, Any]:
+        """Statistics in the same shape as helpers.get_column_stats"""
+        stats = {
+            'type': str(self.dtype),
+            'missing': int(self.missing),
+            'unique': self.unique_estimate()
+        }
+        present = self.count - self.missing
+        if self.numeric and present:
+            stats.update({
+                'min': self.min,
+                'max': self.max,
+                'mean': self.total / present,
+                'median': float(self.sample.astype(float).median())
+            })
+        elif pd.api.types.is_object_dtype(self.dtype) and present and not self.missing:
+            # Same rule as get_column_stats: only fully populated text columns get samples.
+            # Batches parsed as numbers before a later one forced object hold ints/floats,
+            # which the whole-file parse would have read as strings
+            stats['sample_values'] = [str(value) for value in self.sample.iloc[:SAMPLE_VALUES]]
+        return stats
+
+
+def profile_csv(filepath: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Tuple[int, Dict[str, Any]]:
+    """
+    Stream a CSV in row batches and build its column info incrementally.
+    Returns (row_count, column_info) where column_info has the same
+    'types'/'stats' layout as the in-memory upload path.
+    """
+    profiles: Dict[str, ColumnProfile] = {}
+    row_count = 0
+    for chunk in pd.read_csv(filepath, chunksize=chunksize):
+        row_count += len(chunk)
+        for i, col in enumerate(chunk.columns):
+            if col not in profiles:
+                profiles[col] = ColumnProfile(seed=i)
+            profiles[col].update(chunk[col])
+
+    if not profiles:
+        raise ValueError("File contains no columns")
+
+    column_info = {
+        'types': {col: column_type_label(p.dtype) for col, p in profiles.items()},
+        'stats': {col: p.to_stats() for col, p in profiles.items()},
+        'profile': {'mode': 'chunked', 'chunksize': chunksize, 'approximate': ['unique', 'median']}
+    }
+    return row_count, column_info
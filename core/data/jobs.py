@@ -0,0 +1,201 @@
+"""Local worker pool for background jobs with progress reporting"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from core.models import db, JobRecord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_RETENTION_SECONDS = 60 * 60  # Keep finished jobs pollable for an hour
+DEFAULT_TIMEOUT_SECONDS = 30 * 60  # Unfinished jobs silent for this long were lost
+LOST_JOB_ERROR = 'Job stopped reporting progress; its worker was probably restarted'
+
+
+class Job:
+    """State of one background job, updated by the worker as it progresses"""
+
+    def __init__(self, kind: str, on_change: Optional[Callable[['Job'], None]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.progress = 0
+        self.stage = 'queued'
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.on_change = on_change
+
+    @classmethod
+    def from_record(cls, record: JobRecord) -> 'Job':
+        """Read-only copy of a job stored by any worker process"""
+        job = cls(record.kind)
+        job.id = record.id
+        job.status = record.status
+        job.progress = record.progress
+        job.stage = record.stage
+        job.result = json.loads(record.result) if record.result else None
+        job.error = record.error
+        job.created_at = record.created_at
+        job.updated_at = record.updated_at
+        return job
+
+    def report(self, progress: int, stage: str) -> None:
+        """Record progress (0-100) and a short description of the current stage"""
+        self.progress = progress
+        self.stage = stage
+        self.updated_at = time.time()
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'stage': self.stage,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded thread pool inside the Flask app context.
+
+    A job function receives its Job as the first argument, may call
+    job.report() to publish progress, and returns the result dict. If it
+    raises, the job is marked failed and its on_failure callback runs so
+    partial output can be cleaned up.
+
+    Job state is also written to the job table, so a job can be polled
+    through any worker process (e.g. several gunicorn workers), not only
+    the one running it. Stored jobs that stay queued or running without an
+    update for JOB_TIMEOUT_SECONDS (e.g. after a worker was killed) are
+    reported as failed.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.retention_seconds = DEFAULT_RETENTION_SECONDS
+        self.timeout_seconds = DEFAULT_TIMEOUT_SECONDS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.app = app
+        self.retention_seconds = app.config.get('JOB_RETENTION_SECONDS', DEFAULT_RETENTION_SECONDS)
+        self.timeout_seconds = app.config.get('JOB_TIMEOUT_SECONDS', DEFAULT_TIMEOUT_SECONDS)
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get('JOB_WORKERS', DEFAULT_WORKERS),
+            thread_name_prefix='visdraft-job'
+        )
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[..., Dict[str, Any]],
+        *args,
+        on_failure: Optional[Callable[[], None]] = None,
+        **kwargs
+    ) -> Job:
+        """Queue func(job, *args, **kwargs) and return its Job immediately"""
+        if self._executor is None:
+            raise RuntimeError("JobManager is not initialized; call init_app first")
+        job = Job(kind, on_change=self._save)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._prune_records()
+        self._save(job)
+        self._executor.submit(self._run, job, func, args, kwargs, on_failure)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job of this process, or else the stored state of another worker's"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            record = db.session.get(JobRecord, job_id)
+            job = Job.from_record(record) if record is not None else None
+            if job is not None and job.status in ('queued', 'running') \
+                    and job.updated_at < time.time() - self.timeout_seconds:
+                job.status = 'failed'
+                job.error = LOST_JOB_ERROR
+        return job
+
+    def _run(self, job: Job, func, args, kwargs, on_failure) -> None:
+        with self.app.app_context():
+            job.status = 'running'
+            job.report(0, 'starting')
+            try:
+                job.result = func(job, *args, **kwargs)
+                job.status = 'succeeded'
+                job.report(100, 'done')
+            except Exception as e:
+                logger.error(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+                job.error = str(e)
+                job.status = 'failed'
+                job.report(job.progress, 'failed')
+                if on_failure is not None:
+                    try:
+                        on_failure()
+                    except Exception as cleanup_error:
+                        logger.error(f"Cleanup for job {job.id} failed: {str(cleanup_error)}")
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        stale = [job_id for job_id, job in self._jobs.items()
+                 if job.status in ('succeeded', 'failed') and job.updated_at < cutoff]
+        for job_id in stale:
+            del self._jobs[job_id]
+
+    def _save(self, job: Job) -> None:
+        """
+        Write a job's state on its own connection, so the job's session is
+        never committed halfway through its work. Failures are only logged.
+        """
+        values = job.to_dict()
+        values['result'] = json.dumps(job.result, default=str) if job.result is not None else None
+        table = JobRecord.__table__
+        try:
+            with db.engine.begin() as connection:
+                updated = connection.execute(table.update().where(table.c.id == job.id).values(**values))
+                if updated.rowcount == 0:
+                    connection.execute(table.insert().values(**values))
+        except Exception as e:
+            logger.warning(f"Could not store state of job {job.id}: {str(e)}")
+
+    def _prune_records(self) -> None:
+        """
+        Mark stored jobs that went silent past the timeout as failed, and
+        delete those that finished before the retention window
+        """
+        now = time.time()
+        cutoff = now - self.retention_seconds
+        table = JobRecord.__table__
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(table.update().where(
+                    table.c.status.in_(('queued', 'running')), table.c.updated_at < now - self.timeout_seconds
+                ).values(status='failed', stage='failed', error=LOST_JOB_ERROR, updated_at=now))
+                connection.execute(table.delete().where(
+                    table.c.status.in_(('succeeded', 'failed')), table.c.updated_at < cutoff
+                ))
+        except Exception as e:
+            logger.warning(f"Could not prune stored jobs: {str(e)}")
+
+
+job_manager = JobManager()
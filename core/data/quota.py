@@ -0,0 +1,200 @@
+"""Incrementally maintained storage-usage ledger for uploaded datasets"""
+
+import os
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from core.models import db, Dataset, StorageReservation, StorageUsage
+
+logger = logging.getLogger(__name__)
+
+TOTAL = '*'  # Ledger row holding the overall total
+ANONYMOUS = 'anonymous'
+DEFAULT_RESERVATION_SECONDS = 6 * 60 * 60  # Bookings older than this are treated as abandoned
+
+
+def _ensure_rows(*owners: str) -> None:
+    """Create zeroed ledger rows for owners that do not have one yet"""
+    for owner in owners:
+        if db.session.get(StorageUsage, owner) is None:
+            try:
+                db.session.add(StorageUsage(owner=owner, bytes_used=0, file_count=0))
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()  # Created concurrently
+
+
+def _apply(owner: str, delta_bytes: int, delta_files: int, limit: Optional[int] = None, booking=None) -> bool:
+    """
+    Add deltas to the total and owner rows in one transaction. With a limit,
+    the total is only updated if it stays within it (checked by the UPDATE
+    itself, so concurrent uploads cannot both slip under the quota). booking
+    is a statement on the reservation table run in the same transaction;
+    if it matches no row (the booking expired) nothing is applied.
+    """
+    _ensure_rows(TOTAL, owner)
+    condition = [StorageUsage.owner == TOTAL]
+    if limit is not None:
+        condition.append(StorageUsage.bytes_used + delta_bytes <= limit)
+    values = {
+        'bytes_used': StorageUsage.bytes_used + delta_bytes,
+        'file_count': StorageUsage.file_count + delta_files,
+        'updated_at': datetime.utcnow()
+    }
+    # The total row is always written first, so it doubles as the ledger lock
+    result = db.session.execute(db.update(StorageUsage).where(*condition).values(**values))
+    if result.rowcount == 0 or (booking is not None and db.session.execute(booking).rowcount == 0):
+        db.session.rollback()
+        return False
+    if owner != TOTAL:
+        db.session.execute(db.update(StorageUsage).where(StorageUsage.owner == owner).values(**values))
+    db.session.commit()
+    return True
+
+
+def reserve_storage(owner: str, nbytes: int, limit: int) -> Optional[str]:
+    """
+    Book space for a new file if the total stays within limit. Returns the
+    booking's token (None if over the limit); the booking lasts until
+    settle_storage or release_storage resolves it, or reconcile_storage
+    finds it stale.
+    """
+    token = uuid.uuid4().hex
+    booking = db.insert(StorageReservation).values(
+        token=token, owner=owner, bytes_used=nbytes, created_at=datetime.utcnow()
+    )
+    return token if _apply(owner, nbytes, 1, limit, booking) else None
+
+
+def adjust_storage(
+    owner: str,
+    delta_bytes: int,
+    delta_files: int = 0,
+    token: Optional[str] = None,
+    filename: Optional[str] = None
+) -> None:
+    """Correct a booking, e.g. once the real size on disk (and its name) is known"""
+    booking = None
+    if token is not None:
+        booking = (
+            db.update(StorageReservation).where(StorageReservation.token == token)
+            .values(bytes_used=StorageReservation.bytes_used + delta_bytes, filename=filename)
+        )
+    _apply(owner, delta_bytes, delta_files, booking=booking)
+
+
+def release_storage(owner: str, nbytes: int, token: Optional[str] = None) -> None:
+    """Return the space of a removed file, or of the booking token"""
+    booking = None
+    if token is not None:
+        booking = db.delete(StorageReservation).where(StorageReservation.token == token)
+    _apply(owner, -nbytes, -1, booking=booking)
+
+
+def settle_storage(owner: str, token: str) -> None:
+    """
+    Mark a booking as backed by a catalogued Dataset. Commits the session,
+    so the catalog row and the ledger change go in together.
+    """
+    _apply(owner, 0, 0, booking=db.delete(StorageReservation).where(StorageReservation.token == token))
+
+
+def storage_used(owner: str = TOTAL) -> int:
+    """Bytes currently booked for owner (overall total by default)"""
+    row = db.session.get(StorageUsage, owner)
+    return row.bytes_used if row is not None else 0
+
+
+def storage_report(top: int = 20) -> Dict[str, Any]:
+    """Overall total plus per-owner, in-flight booking and largest-dataset breakdowns"""
+    total = db.session.get(StorageUsage, TOTAL)
+    owners = StorageUsage.query.filter(StorageUsage.owner != TOTAL).order_by(StorageUsage.bytes_used.desc()).all()
+    pending_count, pending_bytes = db.session.query(
+        db.func.count(StorageReservation.token),
+        db.func.coalesce(db.func.sum(StorageReservation.bytes_used), 0)
+    ).one()
+    datasets = (
+        db.session.query(Dataset.filename, Dataset.owner, Dataset.file_size)
+        .order_by(Dataset.file_size.desc())
+        .limit(top)
+        .all()
+    )
+    return {
+        'total': total.to_dict() if total else StorageUsage(owner=TOTAL, bytes_used=0, file_count=0).to_dict(),
+        'owners': [row.to_dict() for row in owners],
+        'pending': {'bookings': pending_count, 'bytes_used': pending_bytes},
+        'largest_datasets': [
+            {'filename': row.filename, 'owner': row.owner or ANONYMOUS, 'file_size': row.file_size or 0}
+            for row in datasets
+        ]
+    }
+
+
+def reconcile_storage(
+    directories: Iterable[str],
+    reservation_seconds: int = DEFAULT_RESERVATION_SECONDS
+) -> Dict[str, Any]:
+    """
+    Rebuild the ledger from the disk: refresh each Dataset.file_size from the
+    first directory containing the file (0 if it is gone), then recompute the
+    per-owner and total rows from the datasets plus the bookings of uploads
+    still in flight. Bookings older than reservation_seconds, or whose file
+    is catalogued already, are dropped as abandoned.
+
+    Everything runs in one transaction that first writes the total row, so
+    bookings and rebuilds in other processes wait for it to commit.
+    """
+    directories = list(directories)
+    now = datetime.utcnow()
+    _ensure_rows(TOTAL)
+    db.session.execute(db.update(StorageUsage).where(StorageUsage.owner == TOTAL).values(updated_at=now))
+
+    for dataset in Dataset.query.all():
+        size = 0
+        for directory in directories:
+            path = os.path.join(directory, dataset.filename)
+            if os.path.isfile(path):
+                size = os.path.getsize(path)
+                break
+        dataset.file_size = size
+
+    catalogued = db.select(Dataset.filename)
+    stale = StorageReservation.query.filter(db.or_(
+        StorageReservation.created_at < now - timedelta(seconds=reservation_seconds),
+        StorageReservation.filename.in_(catalogued)
+    ))
+    dropped = stale.delete(synchronize_session=False)
+
+    totals = {}
+    for dataset in Dataset.query.filter(Dataset.file_size > 0):
+        owner = dataset.owner or ANONYMOUS
+        bytes_used, count = totals.get(owner, (0, 0))
+        totals[owner] = (bytes_used + dataset.file_size, count + 1)
+    for reservation in StorageReservation.query:
+        bytes_used, count = totals.get(reservation.owner, (0, 0))
+        totals[reservation.owner] = (bytes_used + reservation.bytes_used, count + 1)
+    totals[TOTAL] = (sum(b for b, _ in totals.values()), sum(c for _, c in totals.values()))
+
+    # Update rows in place so UPDATEs waiting on the total row still find it
+    rows = {row.owner: row for row in StorageUsage.query}
+    for owner in set(rows) | set(totals):
+        row = rows.get(owner) or StorageUsage(owner=owner)
+        row.bytes_used, row.file_count = totals.get(owner, (0, 0))
+        row.updated_at = now
+        db.session.add(row)
+    rows[TOTAL].reconciled_at = now
+    db.session.commit()
+    logger.info(f"Storage ledger reconciled: {len(totals) - 1} owners, {dropped} stale bookings dropped")
+    return storage_report()
+
+
+def reconcile_due(interval_seconds: int) -> bool:
+    """Whether the last reconcile is older than interval_seconds"""
+    total = db.session.get(StorageUsage, TOTAL)
+    if total is None or total.reconciled_at is None:
+        return True
+    return datetime.utcnow() - total.reconciled_at > timedelta(seconds=interval_seconds)
@@ -1,6 +1,7 @@
 """Routes for data source management"""
 
 import os
+import json
 import pandas as pd
 from datetime import datetime
 from flask import (
@@ -8,8 +9,17 @@ from flask import (
     render_template, flash, redirect, url_for
 )
 from werkzeug.utils import secure_filename
-from core.models import db, Dataset
+from core.models import db, Dataset, DatasetAnalysis
+from core.visualizations.dashboard import dashboard_cache
 from core.visualizations.helpers import get_column_types, get_column_stats
+from core.data.analysis import analysis_version, latest_analysis, schedule_analysis
+from core.data.cache import dataset_cache
+from core.data.content import content_filename, find_duplicate, save_hashed
+from core.data.dtypes import optimize_loaded
+from core.data.excel import read_excel_rows
+from core.data.ingest import DEFAULT_CHUNKSIZE, profile_csv
+from core.data.quota import ANONYMOUS, adjust_storage, release_storage
+from core.data.sidecar import read_sidecar, read_sidecar_head, remove_sidecar, write_sidecar
 from . import data_bp
 
 def allowed_file(filename):
@@ -17,6 +27,19 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
+def read_data_file(file_path, file_type, nrows=None, sheet=None):
+    """Parse a CSV or Excel file from disk (workbooks stream only the rows needed)"""
+    if file_type == 'csv':
+        return pd.read_csv(file_path, nrows=nrows)
+    return read_excel_rows(file_path, sheet, nrows=nrows)
+
+def load_data_file(file_path, file_type, sheet=None):
+    """Load a full data file through the shared dataset cache (read-only result)"""
+    def loader():
+        df = read_sidecar(file_path, sheet=sheet)
+        return optimize_loaded(df if df is not None else read_data_file(file_path, file_type, sheet=sheet))
+    return dataset_cache.get_or_load(file_path, loader)
+
 @data_bp.route('/')
 def index():
     """List all available datasets"""
@@ -41,10 +64,14 @@ def upload():
         filename = secure_filename(file.filename)
         original_filename = filename
         
-        # Check if dataset already exists
-        existing = Dataset.query.filter_by(original_filename=original_filename).first()
-        if existing:
-            # Update timestamp of last use
+        # Save the file, hashing it as it streams to disk
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        temp_path, digest, size = save_hashed(file.stream, upload_folder)
+        
+        # Identical content reuses the existing dataset, sidecar and stats
+        existing = find_duplicate(digest, upload_folder)
+        if existing and existing.column_info:
+            os.remove(temp_path)
             existing.last_used = datetime.utcnow()
             db.session.commit()
             return jsonify({
@@ -52,35 +79,65 @@ def upload():
                 'dataset': existing.to_dict()
             })
         
-        # Save the file
-        upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-        file.save(upload_path)
-        
-        # Load and analyze the data
-        if filename.endswith('.csv'):
-            df = pd.read_csv(upload_path)
-        else:  # Excel
-            df = pd.read_excel(upload_path)
-        
-        # Get column information
-        column_info = {
-            'types': get_column_types(df),
-            'stats': get_column_stats(df)
-        }
-        
-        # Create dataset record
-        dataset = Dataset(
-            filename=filename,
-            original_filename=original_filename,
-            file_type=filename.rsplit('.', 1)[1].lower(),
-            row_count=len(df),
-            column_info=json.dumps(column_info),
-            created_at=datetime.utcnow(),
-            last_used=datetime.utcnow()
-        )
+        if existing:
+            # Catalogued (and booked) without a profile yet: profile the stored
+            # file in place rather than storing and counting it a second time
+            os.remove(temp_path)
+            filename = existing.filename
+        else:
+            filename = content_filename(filename, digest)
+        upload_path = os.path.join(upload_folder, filename)
+        if not existing:
+            os.replace(temp_path, upload_path)
+        
+        file_type = filename.rsplit('.', 1)[1].lower()
+        threshold = current_app.config.get('CHUNKED_INGEST_THRESHOLD', 20 * 1024 * 1024)
+        
+        if file_type == 'csv' and os.path.getsize(upload_path) >= threshold:
+            # Stream large CSVs in row batches so memory stays bounded
+            row_count, column_info = profile_csv(
+                upload_path,
+                chunksize=current_app.config.get('INGEST_CHUNKSIZE', DEFAULT_CHUNKSIZE)
+            )
+        else:
+            # Load and analyze the data
+            df = load_data_file(upload_path, file_type)
+            write_sidecar(df, upload_path)
+            row_count = len(df)
+            
+            # Get column information
+            column_info = {
+                'types': get_column_types(df),
+                'stats': get_column_stats(df)
+            }
+        
+        if existing:
+            # Fill in the profile of the existing record
+            dataset = existing
+            dataset.row_count = row_count
+            dataset.column_info = json.dumps(column_info, default=str)
+            dataset.last_used = datetime.utcnow()
+        else:
+            # Create dataset record
+            dataset = Dataset(
+                filename=filename,
+                original_filename=original_filename,
+                file_type=file_type,
+                row_count=row_count,
+                file_size=size,
+                owner=request.remote_user or ANONYMOUS,
+                content_hash=digest,
+                column_info=json.dumps(column_info, default=str),
+                created_at=datetime.utcnow(),
+                last_used=datetime.utcnow()
+            )
+            db.session.add(dataset)
         
-        db.session.add(dataset)
         db.session.commit()
+        dashboard_cache.invalidate()
+        if not existing:
+            adjust_storage(dataset.owner, dataset.file_size, 1)
+        schedule_analysis(dataset.id, upload_path, lambda: load_data_file(upload_path, file_type))
         
         return jsonify({
             'message': 'File uploaded successfully',
@@ -89,8 +146,12 @@ def upload():
         
     except Exception as e:
         # Clean up partial upload if necessary
-        if 'upload_path' in locals() and os.path.exists(upload_path):
+        if 'temp_path' in locals() and os.path.exists(temp_path):
+            os.remove(temp_path)
+        if 'upload_path' in locals() and not existing and os.path.exists(upload_path):
             os.remove(upload_path)
+            dataset_cache.invalidate(upload_path)
+            remove_sidecar(upload_path)
         return jsonify({'error': str(e)}), 500
 
 @data_bp.route('/preview/<int:dataset_id>')
@@ -101,10 +162,10 @@ def preview(dataset_id):
     try:
         file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], dataset.filename)
         
-        if dataset.file_type == 'csv':
-            df = pd.read_csv(file_path, nrows=100)  # Preview first 100 rows
-        else:
-            df = pd.read_excel(file_path, nrows=100)
+        # Preview first 100 rows, from the sidecar's leading batch when it is fresh
+        df = read_sidecar_head(file_path, 100, dataset.sheet_name)
+        if df is None:
+            df = read_data_file(file_path, dataset.file_type, nrows=100, sheet=dataset.sheet_name)
         
         preview_data = df.to_dict(orient='records')
         columns = df.columns.tolist()
@@ -132,10 +193,15 @@ def delete(dataset_id):
         file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], dataset.filename)
         if os.path.exists(file_path):
             os.remove(file_path)
+        dataset_cache.invalidate(file_path)
+        remove_sidecar(file_path)
         
-        # Delete the database record
+        # Delete the database record and its stored analyses
+        DatasetAnalysis.query.filter_by(dataset_id=dataset.id).delete()
         db.session.delete(dataset)
         db.session.commit()
+        dashboard_cache.invalidate()
+        release_storage(dataset.owner or ANONYMOUS, dataset.file_size or 0)
         
         flash('Dataset deleted successfully', 'success')
         
@@ -146,28 +212,30 @@ def delete(dataset_id):
 
 @data_bp.route('/analyze/<int:dataset_id>')
 def analyze(dataset_id):
-    """Analyze a dataset and show statistics"""
+    """
+    Show stored statistics for a dataset. If the file changed since they were
+    computed (or they do not exist yet), a background refresh is queued and the
+    previous results are shown, marked stale, until it finishes.
+    """
     dataset = Dataset.query.get_or_404(dataset_id)
     
     try:
         file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], dataset.filename)
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"{dataset.filename} is missing")
         
-        if dataset.file_type == 'csv':
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path)
-        
-        # Get detailed statistics
-        analysis = {
-            'row_count': len(df),
-            'column_count': len(df.columns),
-            'memory_usage': df.memory_usage(deep=True).sum(),
-            'column_stats': get_column_stats(df),
-            'missing_data': df.isnull().sum().to_dict(),
-            'correlation': df.select_dtypes(include=['number']).corr().to_dict() if not df.select_dtypes(include=['number']).empty else {}
-        }
-        
-        return render_template('data/analyze.html', dataset=dataset, analysis=analysis)
+        stored = latest_analysis(dataset.id)
+        stale = stored is None or stored.version != analysis_version(file_path)
+        job = schedule_analysis(dataset.id, file_path, lambda: load_data_file(file_path, dataset.file_type, dataset.sheet_name)) if stale else None
+        
+        return render_template(
+            'data/analyze.html',
+            dataset=dataset,
+            analysis=json.loads(stored.results) if stored else None,
+            computed_at=stored.computed_at if stored else None,
+            stale=stale,
+            job=job
+        )
         
     except Exception as e:
         flash(f'Error analyzing dataset: {str(e)}', 'error')
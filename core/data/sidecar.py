@@ -0,0 +1,126 @@
+"""Typed columnar (Parquet) sidecars for uploaded data files"""
+
+import os
+import json
+import logging
+from typing import List, Optional, Sequence
+
+import pandas as pd
+
+from core.data.cache import file_version
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Sidecars are an optimization; fall back to raw files
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'processed', 'intermediate')
+SOURCE_KEY = b'visdraft.source'
+
+
+def sidecar_path(filepath: str) -> str:
+    """Location of the Parquet sidecar for a raw data file"""
+    return os.path.join(SIDECAR_DIR, os.path.basename(filepath) + '.parquet')
+
+
+def _source_tag(filepath: str, sheet: Optional[str] = None) -> bytes:
+    """Encode the raw file's version (and sheet) so stale sidecars can be detected"""
+    _, mtime_ns, size = file_version(filepath)
+    source = {'mtime_ns': mtime_ns, 'size': size}
+    if sheet is not None:
+        source['sheet'] = sheet
+    return json.dumps(source).encode()
+
+
+def write_sidecar(df: pd.DataFrame, filepath: str, sheet: Optional[str] = None) -> Optional[str]:
+    """
+    Persist df as a Parquet sidecar for filepath (for workbooks, of the named
+    sheet; None means the first one).
+    Returns the sidecar path, or None if pyarrow is unavailable or the
+    frame cannot be represented (e.g. mixed-type object columns).
+    """
+    if pa is None:
+        return None
+
+    path = sidecar_path(filepath)
+    try:
+        os.makedirs(SIDECAR_DIR, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[SOURCE_KEY] = _source_tag(filepath, sheet)
+        pq.write_table(table.replace_schema_metadata(metadata), path)
+        return path
+    except Exception as e:
+        logger.warning(f"Could not write sidecar for {filepath}: {str(e)}")
+        remove_sidecar(filepath)
+        return None
+
+
+def sidecar_columns(filepath: str, sheet: Optional[str] = None) -> Optional[List[str]]:
+    """Column names from a fresh sidecar's footer, without reading any data"""
+    schema = _fresh_schema(filepath, sheet)
+    return schema.names if schema is not None else None
+
+
+def read_sidecar(
+    filepath: str,
+    columns: Optional[Sequence[str]] = None,
+    sheet: Optional[str] = None
+) -> Optional[pd.DataFrame]:
+    """
+    Read the sidecar for filepath, projecting to columns when given.
+    Returns None when there is no up-to-date sidecar to read from.
+    """
+    schema = _fresh_schema(filepath, sheet)
+    if schema is None:
+        return None
+    if columns is not None and any(col not in schema.names for col in columns):
+        return None
+    try:
+        table = pq.read_table(sidecar_path(filepath), columns=list(columns) if columns is not None else None)
+        return table.to_pandas()
+    except Exception as e:
+        logger.warning(f"Could not read sidecar for {filepath}: {str(e)}")
+        return None
+
+
+def read_sidecar_head(filepath: str, nrows: int, sheet: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """First nrows rows of a fresh sidecar, reading only the leading record batch"""
+    if _fresh_schema(filepath, sheet) is None:
+        return None
+    try:
+        parquet = pq.ParquetFile(sidecar_path(filepath))
+        batch = next(parquet.iter_batches(batch_size=max(nrows, 1)), None)
+        if batch is None:
+            return parquet.schema_arrow.empty_table().to_pandas()
+        return pa.Table.from_batches([batch], schema=parquet.schema_arrow).slice(0, nrows).to_pandas()
+    except Exception as e:
+        logger.warning(f"Could not read sidecar for {filepath}: {str(e)}")
+        return None
+
+
+def remove_sidecar(filepath: str) -> None:
+    """Delete the sidecar for filepath if one exists"""
+    path = sidecar_path(filepath)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _fresh_schema(filepath: str, sheet: Optional[str] = None):
+    """Return the sidecar schema if it exists and matches the raw file's version"""
+    if pq is None:
+        return None
+    path = sidecar_path(filepath)
+    if not os.path.exists(path):
+        return None
+    try:
+        schema = pq.read_schema(path)
+    except Exception:
+        return None
+    metadata = schema.metadata or {}
+    if metadata.get(SOURCE_KEY) != _source_tag(filepath, sheet):
+        return None
+    return schema
@@ -6,6 +6,8 @@ db = SQLAlchemy()
 
 class Visualization(db.Model):
     """Model for storing visualization configurations"""
+    __table_args__ = (db.Index('ix_visualization_template_updated', 'is_template', 'updated_at'),)
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
@@ -16,6 +18,32 @@ class Visualization(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_template = db.Column(db.Boolean, default=False)  # Flag for template visualizations
     tags = db.Column(db.String(255))  # Comma-separated tags for categorization
+    thumbnail = db.Column(db.String(255))  # SVG file name under static/thumbnails
+
+    SUMMARY_FIELDS = (
+        'id', 'name', 'description', 'source_file', 'chart_type',
+        'created_at', 'updated_at', 'is_template', 'tags', 'thumbnail'
+    )
+
+    @classmethod
+    def summary_query(cls):
+        """Query loading only the summary columns, never the config text"""
+        return cls.query.options(db.load_only(*(getattr(cls, name) for name in cls.SUMMARY_FIELDS)))
+
+    def to_summary(self):
+        """Card fields of the visualization, without its config"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'source_file': self.source_file,
+            'chart_type': self.chart_type,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'is_template': self.is_template,
+            'tags': self.tags.split(',') if self.tags else [],
+            'thumbnail': self.thumbnail
+        }
 
     def to_dict(self):
         """Convert model to dictionary"""
@@ -29,7 +57,8 @@ class Visualization(db.Model):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'is_template': self.is_template,
-            'tags': self.tags.split(',') if self.tags else []
+            'tags': self.tags.split(',') if self.tags else [],
+            'thumbnail': self.thumbnail
         }
 
     def get_preview_config(self):
@@ -52,10 +81,37 @@ class Dataset(db.Model):
     file_type = db.Column(db.String(10), nullable=False)  # csv, xlsx, etc.
     row_count = db.Column(db.Integer)
     column_info = db.Column(db.Text)  # JSON string of column names and types
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     last_used = db.Column(db.DateTime)
     description = db.Column(db.Text)
+    file_size = db.Column(db.Integer)  # Bytes on disk, used for listings and quota checks
+    owner = db.Column(db.String(255), index=True)  # Uploading user, for storage breakdowns
+    content_hash = db.Column(db.String(64), index=True)  # sha256 of the file, for upload dedup
+    sheet_name = db.Column(db.String(255))  # Selected workbook sheet; None means the first
     
+    SUMMARY_FIELDS = (
+        'id', 'filename', 'original_filename', 'file_type', 'row_count',
+        'created_at', 'last_used', 'file_size'
+    )
+
+    @classmethod
+    def summary_query(cls):
+        """Query loading only the summary columns, never the column_info text"""
+        return cls.query.options(db.load_only(*(getattr(cls, name) for name in cls.SUMMARY_FIELDS)))
+
+    def to_summary(self):
+        """Listing fields of the dataset, without its column profile"""
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'original_filename': self.original_filename,
+            'file_type': self.file_type,
+            'row_count': self.row_count,
+            'created_at': self.created_at.isoformat(),
+            'last_used': self.last_used.isoformat() if self.last_used else None,
+            'file_size': self.file_size
+        }
+
     def to_dict(self):
         """Convert model to dictionary"""
         return {
@@ -64,14 +120,95 @@ class Dataset(db.Model):
             'original_filename': self.original_filename,
             'file_type': self.file_type,
             'row_count': self.row_count,
-            'column_info': json.loads(self.column_info),
+            'column_info': json.loads(self.column_info) if self.column_info else {},
             'created_at': self.created_at.isoformat(),
             'last_used': self.last_used.isoformat() if self.last_used else None,
-            'description': self.description
+            'description': self.description,
+            'file_size': self.file_size,
+            'owner': self.owner,
+            'content_hash': self.content_hash,
+            'sheet_name': self.sheet_name
+        }
+
+class StorageUsage(db.Model):
+    """Running storage totals per owner; the '*' row holds the overall total"""
+    owner = db.Column(db.String(255), primary_key=True)
+    bytes_used = db.Column(db.BigInteger, nullable=False, default=0)
+    file_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    reconciled_at = db.Column(db.DateTime)  # Set on the '*' row by the last reconcile
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            'owner': self.owner,
+            'bytes_used': self.bytes_used,
+            'file_count': self.file_count,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'reconciled_at': self.reconciled_at.isoformat() if self.reconciled_at else None
         }
 
+class StorageReservation(db.Model):
+    """Space booked in the ledger for an upload that is not catalogued yet"""
+    token = db.Column(db.String(32), primary_key=True)
+    owner = db.Column(db.String(255), nullable=False)
+    bytes_used = db.Column(db.BigInteger, nullable=False)
+    filename = db.Column(db.String(255))  # Stored name, once the upload is on disk
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+class DatasetAnalysis(db.Model):
+    """Stored /data/analyze results for one version of a dataset's file"""
+    __table_args__ = (db.UniqueConstraint('dataset_id', 'version'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    dataset_id = db.Column(db.Integer, db.ForeignKey('dataset.id'), nullable=False, index=True)
+    version = db.Column(db.String(64), nullable=False)  # File mtime and size the results describe
+    results = db.Column(db.Text, nullable=False)  # JSON string of the analysis
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            'id': self.id,
+            'dataset_id': self.dataset_id,
+            'version': self.version,
+            'results': json.loads(self.results),
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+
+class JobRecord(db.Model):
+    """State of a background job, shared by every worker process polling it"""
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # queued, running, succeeded, failed
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    stage = db.Column(db.String(100))
+    result = db.Column(db.Text)  # JSON string of the job's result
+    error = db.Column(db.Text)
+    created_at = db.Column(db.Float, nullable=False)  # Unix timestamps, as reported by Job
+    updated_at = db.Column(db.Float, nullable=False, index=True)
+
+def add_missing_columns():
+    """
+    Add columns and indexes defined on the models but missing from existing
+    tables, since create_all only creates tables that do not exist yet.
+    """
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                db.session.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+        db.session.commit()
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
 def init_db(app):
     """Initialize the database and create tables"""
     db.init_app(app)
     with app.app_context():
-        db.create_all()
\ No newline at end of file
+        db.create_all()
+        add_missing_columns()
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""Home dashboard data from config-free projections, cached for a short TTL"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from sqlalchemy import desc
+
+from core.models import db, Dataset, Visualization
+
+DEFAULT_TTL_SECONDS = 30
+
+
+class SummaryCache:
+    """
+    Values kept for DASHBOARD_CACHE_SECONDS or until invalidate() is called
+    after a save or delete. A value computed while an invalidation happened
+    is returned but not stored, so it cannot outlive the change.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.ttl = app.config.get('DASHBOARD_CACHE_SECONDS', DEFAULT_TTL_SECONDS)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        value = compute()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+
+dashboard_cache = SummaryCache()
+
+
+def dashboard_summary() -> Dict[str, Any]:
+    """Recent visualizations, templates and recent datasets for the home page"""
+    def compute():
+        recent_vizs = (
+            Visualization.summary_query().filter_by(is_template=False)
+            .order_by(desc(Visualization.updated_at)).limit(5).all()
+        )
+        templates = Visualization.summary_query().filter_by(is_template=True).all()
+        recent_datasets = Dataset.summary_query().order_by(desc(Dataset.last_used)).limit(5).all()
+        return {
+            'recent_vizs': [viz.to_summary() for viz in recent_vizs],
+            'templates': [viz.to_summary() for viz in templates],
+            'recent_datasets': [ds.to_summary() for ds in recent_datasets]
+        }
+    return dashboard_cache.get_or_compute('summary', compute)
+
+
+def dashboard_stats() -> Dict[str, Any]:
+    """Totals and recent activity polled by the dashboard (/api/stats)"""
+    def compute():
+        recent_activity = (
+            db.session.query(Visualization.id, Visualization.name, Visualization.chart_type, Visualization.updated_at)
+            .filter_by(is_template=False)
+            .order_by(desc(Visualization.updated_at))
+            .limit(10)
+            .all()
+        )
+        return {
+            'total_visualizations': Visualization.query.filter_by(is_template=False).count(),
+            'total_datasets': Dataset.query.count(),
+            'recent_activity': [
+                {
+                    'id': viz_id,
+                    'name': name,
+                    'type': chart_type,
+                    'updated_at': updated_at.isoformat(),
+                }
+                for viz_id, name, chart_type, updated_at in recent_activity
+            ]
+        }
+    return dashboard_cache.get_or_compute('stats', compute)
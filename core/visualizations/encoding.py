@@ -0,0 +1,110 @@
+"""Binary typed-array encoding for Plotly figure payloads"""
+
+import base64
+import json
+from typing import Any, Dict, Optional
+
+import numpy as np
+from flask import current_app
+from plotly.utils import PlotlyJSONEncoder
+
+ENCODINGS = ("json", "b64")  # b64 typed arrays need plotly.js >= 2.28 on the client
+
+# Integer dtypes understood by plotly.js typed arrays, smallest first
+INTEGER_DTYPES = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32]
+
+
+def encode_typed_array(values: Any) -> Optional[Dict[str, str]]:
+    """
+    Encode a numeric array as Plotly's {dtype, bdata[, shape]} typed-array form.
+    Returns None for anything that is not a non-empty numeric (non-bool) array,
+    so callers can leave those values as they are.
+    """
+    if isinstance(values, (list, tuple)):
+        if not values or any(isinstance(v, bool) for v in values):
+            return None
+        values = np.asarray(values)
+    if not isinstance(values, np.ndarray) or values.size == 0 or values.ndim > 2:
+        return None
+
+    if values.dtype.kind in 'iu':
+        low, high = values.min(), values.max()
+        for dtype in INTEGER_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                values = values.astype(dtype, copy=False)
+                break
+        else:
+            values = values.astype(np.float64)
+    elif values.dtype.kind == 'f':
+        values = values.astype(np.float64, copy=False)
+    else:
+        return None
+
+    values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder('<'))
+    encoded = {
+        'dtype': values.dtype.str[1:],
+        'bdata': base64.b64encode(values.tobytes()).decode('ascii')
+    }
+    if values.ndim == 2:
+        encoded['shape'] = f'{values.shape[0]}, {values.shape[1]}'
+    return encoded
+
+
+def _encode_value(value: Any) -> Any:
+    """Recursively replace numeric arrays inside a trace with typed arrays"""
+    if isinstance(value, dict):
+        return {key: _encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        encoded = encode_typed_array(value)
+        if encoded is not None:
+            return encoded
+        if isinstance(value, np.ndarray):
+            return value
+        return [_encode_value(item) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+def encode_figure(figure: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a figure dict whose trace arrays use typed-array encoding"""
+    encoded = dict(figure)
+    encoded['data'] = [_encode_value(trace) for trace in figure.get('data', [])]
+    return encoded
+
+
+def decode_typed_array(value: Dict[str, Any]) -> list:
+    """Turn a {dtype, bdata[, shape]} typed array back into a (nested) list"""
+    dtype = np.dtype(value.get('dtype', 'f8')).newbyteorder('<')
+    values = np.frombuffer(base64.b64decode(value['bdata']), dtype=dtype)
+    if value.get('shape'):
+        values = values.reshape([int(part) for part in str(value['shape']).split(',')])
+    return values.tolist()
+
+
+def _decode_value(value: Any) -> Any:
+    """Recursively replace typed arrays inside a trace with plain lists"""
+    if isinstance(value, dict):
+        if 'bdata' in value and 'dtype' in value:
+            return decode_typed_array(value)
+        return {key: _decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(item) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+def decode_figure(figure: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return a copy of a figure dict with typed arrays decoded to lists, for
+    storage and for renderers bundling a plotly.js older than 2.28
+    """
+    decoded = dict(figure)
+    decoded['data'] = [_decode_value(trace) for trace in figure.get('data', [])]
+    return decoded
+
+
+def json_response(payload: Dict[str, Any]):
+    """Serialize a payload containing figures exactly once, numpy-aware"""
+    return current_app.response_class(
+        json.dumps(payload, cls=PlotlyJSONEncoder),
+        mimetype='application/json'
+    )
@@ -0,0 +1,149 @@
+"""Server-side PNG/SVG/HTML export of saved visualizations, cached on disk"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import plotly.io as pio
+
+from core.visualizations.encoding import decode_figure
+
+try:
+    import kaleido
+except ImportError:  # Static images need kaleido; HTML export works without it
+    kaleido = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+    'html': 'text/html'
+}
+IMAGE_FORMATS = ('png', 'svg')
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT_SECONDS = 30
+DIGEST_LENGTH = 16
+
+
+def export_options(width: Optional[int], height: Optional[int], scale: Optional[float]) -> Dict[str, Any]:
+    """Rendering options that affect the output, without unset ones"""
+    options = {'width': width, 'height': height, 'scale': scale}
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def export_filename(viz_id: int, config: str, fmt: str, options: Dict[str, Any]) -> str:
+    """
+    Cache file name for an export: the viz id, a hash of its saved config and
+    of the rendering options, so any change to either misses the cache.
+    """
+    config_digest = hashlib.sha256(config.encode()).hexdigest()[:DIGEST_LENGTH]
+    name = f"viz-{viz_id}-{config_digest}"
+    if options:
+        raw = json.dumps(options, sort_keys=True).encode()
+        name += '-' + hashlib.sha256(raw).hexdigest()[:8]
+    return f"{name}.{fmt}"
+
+
+def render_figure(config: str, fmt: str, options: Dict[str, Any], html_options: Dict[str, Any]) -> bytes:
+    """
+    Render a saved Plotly figure (JSON string) to the bytes of fmt. Typed
+    arrays are decoded first, since the bundled plotly.js predates them.
+    """
+    figure = decode_figure(json.loads(config))
+    if fmt == 'html':
+        html = pio.to_html(figure, full_html=True, validate=False, **html_options)
+        return html.encode('utf-8')
+    return pio.to_image(figure, format=fmt, validate=False, **options)
+
+
+class ExportRenderer:
+    """
+    Renders exports on a bounded thread pool and keeps the results under
+    the exports directory. Concurrent requests for the same file share one
+    render, and a request that gives up waiting leaves the render running
+    so the file is ready for the next attempt.
+    """
+
+    def __init__(self):
+        self.directory: Optional[str] = None
+        self.timeout = DEFAULT_TIMEOUT_SECONDS
+        self.html_options: Dict[str, Any] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.directory = app.config.get('EXPORT_FOLDER') or os.path.join(app.static_folder, 'exports')
+        self.timeout = app.config.get('EXPORT_TIMEOUT_SECONDS', DEFAULT_TIMEOUT_SECONDS)
+        self.html_options = {
+            'include_plotlyjs': app.config.get('EXPORT_HTML_PLOTLYJS', True),
+            'config': app.config.get('PLOTLY_CONFIG', {})
+        }
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get('EXPORT_WORKERS', DEFAULT_WORKERS),
+            thread_name_prefix='visdraft-export'
+        )
+        os.makedirs(self.directory, exist_ok=True)
+
+    def export(self, viz_id: int, config: str, fmt: str, options: Dict[str, Any]) -> str:
+        """
+        Return the file name of the export under self.directory, rendering it
+        first if it is not cached. Raises concurrent.futures.TimeoutError when
+        the render takes longer than EXPORT_TIMEOUT_SECONDS.
+        """
+        if self._executor is None:
+            raise RuntimeError("ExportRenderer is not initialized; call init_app first")
+        if fmt in IMAGE_FORMATS and kaleido is None:
+            raise ValueError("PNG and SVG export require the kaleido package")
+
+        filename = export_filename(viz_id, config, fmt, options)
+        if os.path.exists(os.path.join(self.directory, filename)):
+            return filename
+
+        with self._lock:
+            future = self._inflight.get(filename)
+            if future is None:
+                future = self._executor.submit(self._render, viz_id, config, fmt, options, filename)
+                self._inflight[filename] = future
+        future.result(timeout=self.timeout)
+        return filename
+
+    def remove(self, viz_id: int) -> None:
+        """Delete every cached export of a visualization"""
+        if self.directory is None:
+            return
+        for path in glob.glob(os.path.join(self.directory, f"viz-{viz_id}-*")):
+            os.remove(path)
+
+    def _render(self, viz_id: int, config: str, fmt: str, options: Dict[str, Any], filename: str) -> None:
+        try:
+            body = render_figure(config, fmt, options, self.html_options)
+            path = os.path.join(self.directory, filename)
+            temp_path = path + '.part'
+            with open(temp_path, 'wb') as f:
+                f.write(body)
+            os.replace(temp_path, path)
+            self._remove_stale(viz_id, filename)
+        except Exception as e:
+            logger.error(f"Export of visualization {viz_id} as {fmt} failed: {str(e)}")
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(filename, None)
+
+    def _remove_stale(self, viz_id: int, filename: str) -> None:
+        """Drop exports rendered from an older config of the same visualization"""
+        current = filename.rsplit('.', 1)[0].split('-')[2]
+        for path in glob.glob(os.path.join(self.directory, f"viz-{viz_id}-*")):
+            name = os.path.basename(path)
+            if name.split('-')[2].split('.')[0] != current and not name.endswith('.part'):
+                os.remove(path)
+
+
+export_renderer = ExportRenderer()
@@ -2,6 +2,7 @@
 
 import os
 import json
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -24,32 +25,562 @@ def validate_numeric_columns(df: pd.DataFrame, columns: List[str]) -> Tuple[bool
 def apply_aggregation(df: pd.DataFrame, group_cols: List[str], y_col: str, agg_func: str) -> pd.DataFrame:
     """Apply aggregation to the DataFrame based on specified function"""
     if agg_func == "count":
-        return df.groupby(group_cols).size().reset_index(name=y_col)
-    return df.groupby(group_cols)[y_col].agg(agg_func).reset_index()
+        return df.groupby(group_cols, observed=True).size().reset_index(name=y_col)
+    return df.groupby(group_cols, observed=True)[y_col].agg(agg_func).reset_index()
+
+def summarize_groups(df: pd.DataFrame, group_cols: List[str], y_col: str) -> pd.DataFrame:
+    """
+    Compute a reusable per-group summary in a single groupby pass.
+    Always includes the group 'size'; numeric y columns also get 'sum',
+    'count' (non-null), 'min' and 'max' so any aggregation can be derived.
+    """
+    grouped = df.groupby(group_cols, observed=True)
+    if pd.api.types.is_numeric_dtype(df[y_col]):
+        summary = grouped[y_col].agg(['size', 'sum', 'count', 'min', 'max'])
+    else:
+        summary = grouped.size().to_frame('size')
+    return summary.reset_index()
+
+def aggregate_from_summary(summary: pd.DataFrame, group_cols: List[str], agg_func: str, name: str) -> pd.DataFrame:
+    """Derive one aggregation from a summarize_groups table, mean as sum / count"""
+    if agg_func == 'size':
+        values = summary['size']
+    elif agg_func == 'mean':
+        values = summary['sum'] / summary['count']
+    else:
+        values = summary[agg_func]
+    result = summary[group_cols].copy()
+    result[name] = values
+    return result
+
+def plain_categories(df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Return df with categorical columns (of those given) converted back to
+    plain values. Plotly express groups categoricals over every category,
+    including ones a filter removed, which breaks its trace lookups.
+    """
+    columns = df.columns if columns is None else columns
+    converted = {
+        col: df[col].astype(df[col].cat.categories.dtype)
+        for col in dict.fromkeys(columns)
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+    return df.assign(**converted) if converted else df
+
+FILTER_OPERATORS = (
+    '==', '!=', '>', '>=', '<', '<=', 'contains', 'between',
+    'in', 'not in', 'is null', 'not null', 'date between'
+)
+
+def _is_text(series: pd.Series) -> bool:
+    """Whether a column holds strings (object, string or category dtype)"""
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series) \
+        or isinstance(series.dtype, pd.CategoricalDtype)
+
+def _coerce_literal(series: pd.Series, value: Any) -> Any:
+    """Convert a filter literal to the column's type for comparison"""
+    if value is None:
+        return None
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pd.Timestamp(value)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return float(value)
+    return value
+
+def _orderable(series: pd.Series) -> pd.Series:
+    """Unordered categoricals compare by value for <, >, and range filters"""
+    if isinstance(series.dtype, pd.CategoricalDtype) and not series.cat.ordered:
+        return series.astype(series.cat.categories.dtype)
+    return series
+
+def _to_mask(result: pd.Series) -> np.ndarray:
+    """Boolean numpy mask from a comparison result, missing values as False"""
+    return result.to_numpy(dtype=bool, na_value=False)
+
+def _range_predicate(bounds: Any, as_dates: bool):
+    """Inclusive range test; either bound may be None for an open range"""
+    if not isinstance(bounds, (list, tuple)) or len(bounds) != 2:
+        raise ValueError("Range filters need a [low, high] value")
+    low, high = bounds
+    if as_dates:
+        low = pd.Timestamp(low) if low is not None else None
+        high = pd.Timestamp(high) if high is not None else None
+
+    def predicate(series: pd.Series) -> np.ndarray:
+        if as_dates and not pd.api.types.is_datetime64_any_dtype(series):
+            series = pd.to_datetime(series, errors='coerce')
+        series = _orderable(series)
+        mask = np.ones(len(series), dtype=bool)
+        if low is not None:
+            mask &= _to_mask(series >= (low if as_dates else _coerce_literal(series, low)))
+        if high is not None:
+            mask &= _to_mask(series <= (high if as_dates else _coerce_literal(series, high)))
+        return mask
+    return predicate
+
+def _compile_filter(f: Dict[str, Any]):
+    """Build a predicate mapping a column to a boolean mask for one filter"""
+    op, value = f.get('operator'), f.get('value')
+    if op not in FILTER_OPERATORS:
+        raise ValueError(f"Unsupported filter operator: {op}")
+    # Literal matching is exact except for 'contains', unless caseSensitive is given
+    case_sensitive = bool(f.get('caseSensitive', op != 'contains'))
+
+    if op in ('is null', 'not null'):
+        return lambda s: _to_mask(s.isna() if op == 'is null' else s.notna())
+    if op in ('between', 'date between'):
+        return _range_predicate(value, as_dates=op == 'date between')
+    if op == 'contains':
+        needle = str(value)
+        return lambda s: _to_mask(
+            (s if _is_text(s) else s.astype('string')).str.contains(needle, case=case_sensitive, regex=False)
+        )
+    if op in ('in', 'not in'):
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        folded = {str(v).casefold() for v in values}
+
+        def member(series: pd.Series) -> np.ndarray:
+            if not case_sensitive and _is_text(series):
+                result = series.astype('string').str.casefold().isin(folded)
+            else:
+                result = series.isin([_coerce_literal(series, v) for v in values])
+            return _to_mask(result)
+        return member if op == 'in' else (lambda s: ~member(s))
+
+    compare = {
+        '==': lambda a, b: a == b,
+        '!=': lambda a, b: a != b,
+        '>': lambda a, b: a > b,
+        '>=': lambda a, b: a >= b,
+        '<': lambda a, b: a < b,
+        '<=': lambda a, b: a <= b
+    }[op]
+    if not case_sensitive and isinstance(value, str):
+        needle = value.casefold()
+
+        def folded_compare(series: pd.Series) -> np.ndarray:
+            if _is_text(series):
+                return _to_mask(compare(series.astype('string').str.casefold(), needle))
+            return _to_mask(compare(series, _coerce_literal(series, value)))
+        return folded_compare
+    if op in ('==', '!='):
+        return lambda s: _to_mask(compare(s, _coerce_literal(s, value)))
+    return lambda s: _to_mask(compare(_orderable(s), _coerce_literal(s, value)))
+
+class FilterSet:
+    """
+    A filter list compiled once into per-column predicates.
+
+    Each filter is a dict with 'column', 'operator' (see FILTER_OPERATORS),
+    'value' and optionally 'caseSensitive'. mask() ANDs every predicate into
+    a single boolean array, so applying the set slices the frame once.
+    """
+
+    def __init__(self, filters: Optional[List[Dict[str, Any]]]):
+        self.filters = list(filters or [])
+        for f in self.filters:
+            if not isinstance(f, dict) or not f.get('column'):
+                raise ValueError("Each filter needs a column")
+        self.predicates = [(f['column'], _compile_filter(f)) for f in self.filters]
+        self.columns = list(dict.fromkeys(column for column, _ in self.predicates))
+
+    def __bool__(self) -> bool:
+        return bool(self.predicates)
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Boolean mask of the rows passing every filter"""
+        mask = np.ones(len(df), dtype=bool)
+        for column, predicate in self.predicates:
+            np.logical_and(mask, predicate(df[column]), out=mask)
+        return mask
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of df passing every filter (df itself when nothing is removed)"""
+        if not self.predicates:
+            return df
+        mask = self.mask(df)
+        return df if mask.all() else df[mask]
 
 def apply_filters(df: pd.DataFrame, filters: List[Dict[str, Any]]) -> pd.DataFrame:
     """Apply filters to the DataFrame"""
-    if not filters:
-        return df
-        
-    df_filtered = df.copy()
-    for f in filters:
-        col, op, val = f['column'], f['operator'], f['value']
-        if op == '==':
-            df_filtered = df_filtered[df_filtered[col] == val]
-        elif op == '!=':
-            df_filtered = df_filtered[df_filtered[col] != val]
-        elif op == '>':
-            df_filtered = df_filtered[df_filtered[col] > float(val)]
-        elif op == '<':
-            df_filtered = df_filtered[df_filtered[col] < float(val)]
-        elif op == 'contains':
-            df_filtered = df_filtered[df_filtered[col].str.contains(val, case=False)]
-        elif op == 'between':
-            low, high = val
-            df_filtered = df_filtered[(df_filtered[col] >= low) & (df_filtered[col] <= high)]
-    
-    return df_filtered
+    return FilterSet(filters).apply(df)
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: choose n_out positions that preserve the
+    visual shape of an ordered series. Always keeps the first and last point.
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+
+    # n_out - 2 buckets between the fixed endpoints, plus a sentinel at n
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(int), n)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        avg_x = np.nanmean(x[next_start:next_end])
+        avg_y = np.nanmean(y[next_start:next_end])
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(np.nan_to_num(areas, nan=-1.0)))
+        selected[i + 1] = a
+    return selected
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Min/max bucketing: split the series into equal buckets and keep the lowest
+    and highest point of each (plus the endpoints), so peaks and troughs survive.
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 4:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+    buckets = np.arange(n) * ((n_out - 2) // 2) // n
+    values = pd.Series(y)
+    keep = np.concatenate([
+        values.groupby(buckets).idxmin().to_numpy(),
+        values.groupby(buckets).idxmax().to_numpy(),
+        [0, n - 1]
+    ]).astype(np.int64)
+    return np.unique(keep)
+
+def allocate_budget(sizes: List[int], total: int) -> np.ndarray:
+    """
+    Split total points across groups in proportion to their sizes, by largest
+    remainder, so the shares sum to at most total. Every group gets at least
+    one point while there are enough; otherwise only the largest groups do.
+    """
+    sizes = np.asarray(sizes, dtype=float)
+    shares = np.zeros(len(sizes), dtype=np.int64)
+    if total <= 0 or len(sizes) == 0:
+        return shares
+    if len(sizes) >= total:
+        shares[np.argsort(-sizes, kind='stable')[:total]] = 1
+        return shares
+    quotas = 1 + (total - len(sizes)) * sizes / sizes.sum()
+    shares = np.floor(quotas).astype(np.int64)
+    remainder = total - shares.sum()
+    shares[np.argsort(-(quotas - shares), kind='stable')[:remainder]] += 1
+    return shares
+
+def downsample(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: str,
+    max_points: int,
+    method: str = 'auto',
+    group_col: Optional[str] = None
+) -> Tuple[pd.DataFrame, str]:
+    """
+    Reduce df to at most max_points rows using shape-preserving downsampling.
+    method is 'lttb', 'minmax' or 'auto' (min/max for datetime x, LTTB
+    otherwise). Rows without a y value are dropped before bucketing. Each
+    group_col trace gets a share of the budget proportional to its size (see
+    allocate_budget). Returns the reduced frame and the method used.
+    """
+    if method == 'auto':
+        method = 'minmax' if pd.api.types.is_datetime64_any_dtype(df[x_col]) else 'lttb'
+    if method not in ('lttb', 'minmax'):
+        raise ValueError(f"Unsupported downsampling method: {method}")
+    if len(df) <= max_points:
+        return df, method
+
+    def select(part: pd.DataFrame, budget: int) -> np.ndarray:
+        y = pd.to_numeric(part[y_col], errors='coerce').to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(y))
+        if len(valid) <= budget:
+            return valid
+        if method == 'minmax':
+            return valid[minmax_indices(y[valid], budget)]
+        x = part[x_col]
+        if pd.api.types.is_datetime64_any_dtype(x):
+            x = x.astype('int64').to_numpy(dtype=float)
+        elif pd.api.types.is_numeric_dtype(x):
+            x = x.to_numpy(dtype=float)
+        else:
+            x = np.arange(len(part), dtype=float)  # Categorical x: use row order
+        return valid[lttb_indices(x[valid], y[valid], budget)]
+
+    if not group_col:
+        return df.iloc[select(df, max_points)], method
+
+    positions = [np.empty(0, dtype=np.int64)]
+    offsets = pd.Series(np.arange(len(df)), index=df.index)
+    parts = [part for _, part in df.groupby(group_col, sort=False, observed=True)]
+    budgets = allocate_budget([len(part) for part in parts], max_points)
+    for part, budget in zip(parts, budgets):
+        if budget > 0:
+            positions.append(offsets.loc[part.index].to_numpy()[select(part, int(budget))])
+    return df.iloc[np.sort(np.concatenate(positions))], method
+
+MAX_HISTOGRAM_BINS = 500
+
+def histogram_edges(
+    values: np.ndarray,
+    bins: Optional[int] = None,
+    bin_width: Optional[float] = None,
+    log_scale: bool = False
+) -> np.ndarray:
+    """
+    Compute histogram bin edges for finite numeric values.
+    bin_width takes precedence over bins; log_scale uses geometrically spaced
+    edges over the positive values. The bin count is capped at MAX_HISTOGRAM_BINS.
+    """
+    if len(values) == 0:
+        return np.array([0.0, 1.0])
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        return np.array([low - 0.5, high + 0.5])
+
+    if log_scale:
+        count = min(bins or 50, MAX_HISTOGRAM_BINS)
+        return np.geomspace(low, high, count + 1)
+    if bin_width:
+        start = np.floor(low / bin_width) * bin_width
+        count = int(np.ceil((high - start) / bin_width)) or 1
+        if count <= MAX_HISTOGRAM_BINS:
+            return start + bin_width * np.arange(count + 1)
+        bins = MAX_HISTOGRAM_BINS
+    if bins:
+        return np.linspace(low, high, min(bins, MAX_HISTOGRAM_BINS) + 1)
+
+    edges = np.histogram_bin_edges(values, bins='auto')
+    if len(edges) - 1 > MAX_HISTOGRAM_BINS:
+        edges = np.linspace(low, high, MAX_HISTOGRAM_BINS + 1)
+    return edges
+
+def build_histogram_figure(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: Optional[str] = None,
+    color_col: Optional[str] = None,
+    bins: Optional[int] = None,
+    bin_width: Optional[float] = None,
+    log_scale: bool = False,
+    title: Optional[str] = None,
+    height: Optional[int] = None
+) -> go.Figure:
+    """
+    Build a histogram from server-side bin counts, one bar per bin, so the
+    figure size does not grow with the number of rows. When y_col is given
+    the bars hold the per-bin sum of y (like px.histogram with a y column).
+    Non-numeric x is counted per distinct value.
+    """
+    x = df[x_col]
+    weights = pd.to_numeric(df[y_col], errors='coerce').fillna(0) if y_col else None
+    groups = [(None, slice(None))] if not color_col else [
+        (name, df[color_col].to_numpy() == name) for name in df[color_col].dropna().unique()
+    ]
+    fig = go.Figure()
+
+    is_datetime = pd.api.types.is_datetime64_any_dtype(x)
+    if pd.api.types.is_numeric_dtype(x) or is_datetime:
+        numeric = x.astype('int64').to_numpy(dtype=float) if is_datetime else x.to_numpy(dtype=float)
+        valid = np.isfinite(numeric) & (x.notna().to_numpy())
+        if log_scale:
+            valid &= numeric > 0
+        edges = histogram_edges(numeric[valid], bins, bin_width, log_scale)
+        centers = (edges[:-1] + edges[1:]) / 2
+        labels = pd.to_datetime(edges) if is_datetime else edges
+        customdata = np.column_stack([labels[:-1].astype(str), labels[1:].astype(str)])
+        plot_x = pd.to_datetime(centers) if is_datetime else centers
+
+        for name, mask in groups:
+            selected = valid & (np.ones(len(df), dtype=bool) if name is None else mask)
+            counts, _ = np.histogram(
+                numeric[selected], bins=edges,
+                weights=None if weights is None else weights.to_numpy()[selected]
+            )
+            fig.add_trace(go.Bar(
+                x=plot_x, y=counts, width=None if is_datetime else np.diff(edges),
+                name=None if name is None else str(name), customdata=customdata,
+                hovertemplate='%{customdata[0]} to %{customdata[1]}<br>%{y}<extra></extra>'
+            ))
+        if log_scale:
+            fig.update_xaxes(type='log')
+    else:
+        for name, mask in groups:
+            part = x if name is None else x[mask]
+            if weights is None:
+                counts = part.value_counts(sort=False)
+                counts = counts[counts > 0]  # Categoricals also count absent categories
+            else:
+                counts = (weights if name is None else weights[mask]).groupby(part, observed=True).sum()
+            fig.add_trace(go.Bar(
+                x=counts.index.astype(str), y=counts.to_numpy(),
+                name=None if name is None else str(name)
+            ))
+
+    fig.update_layout(
+        title=title or 'Histogram Chart',
+        barmode='relative',
+        bargap=0,
+        showlegend=bool(color_col),
+        xaxis_title=x_col,
+        yaxis_title=f'sum of {y_col}' if y_col else 'count'
+    )
+    if height:
+        fig.update_layout(height=height)
+    return fig
+
+MAX_OUTLIERS = 200  # Outlier points kept per box; extremes are always included
+KDE_GRID_POINTS = 128
+
+def binned_kde(values: np.ndarray, points: int = KDE_GRID_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gaussian kernel density estimate (Scott's bandwidth) evaluated on a grid.
+    Values are binned first and the bin counts convolved with the kernel, so
+    the cost is O(n + points^2) rather than O(n * points).
+    """
+    n = len(values)
+    bandwidth = float(values.std()) * n ** (-1 / 5)
+    if bandwidth == 0:
+        bandwidth = max(abs(float(values.mean())) * 1e-3, 1e-3)
+    low, high = float(values.min()) - 2 * bandwidth, float(values.max()) + 2 * bandwidth
+    counts, edges = np.histogram(values, bins=points, range=(low, high))
+    grid = (edges[:-1] + edges[1:]) / 2
+    step = grid[1] - grid[0]
+    half = min(int(np.ceil(4 * bandwidth / step)), (points - 1) // 2)
+    kernel = np.exp(-0.5 * ((np.arange(-half, half + 1) * step) / bandwidth) ** 2)
+    # Normalizing the sampled kernel keeps the area at 1 even when the grid is coarse
+    density = np.convolve(counts, kernel / kernel.sum(), mode='same') / (n * step)
+    return grid, density
+
+def distribution_summary(values: np.ndarray, kde: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Box-plot statistics for one group: quartiles, Tukey whiskers (1.5 IQR),
+    mean and up to MAX_OUTLIERS outliers, plus a KDE curve when kde is True.
+    Returns None when there are no finite values.
+    """
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    lowerfence, upperfence = float(inside.min()), float(inside.max())
+    outliers = np.sort(values[(values < lowerfence) | (values > upperfence)])
+    outlier_count = len(outliers)
+    if outlier_count > MAX_OUTLIERS:
+        outliers = outliers[np.linspace(0, outlier_count - 1, MAX_OUTLIERS).astype(int)]
+
+    summary = {
+        'count': len(values),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'lowerfence': lowerfence,
+        'upperfence': upperfence,
+        'mean': float(values.mean()),
+        'outliers': outliers,
+        'outlier_count': outlier_count
+    }
+    if kde:
+        summary['kde_grid'], summary['kde_density'] = binned_kde(values)
+    return summary
+
+def build_distribution_figure(
+    df: pd.DataFrame,
+    kind: str,
+    value_col: str,
+    group_col: Optional[str] = None,
+    color_col: Optional[str] = None,
+    title: Optional[str] = None
+) -> go.Figure:
+    """
+    Build a box or violin chart from per-group summaries computed server-side,
+    so the figure size depends on the number of groups, not rows.
+    Groups are laid out at numeric positions (vertical when group_col is
+    given, a single horizontal distribution otherwise); color_col splits each
+    position into side-by-side traces.
+    """
+    if kind not in ('box', 'violin'):
+        raise ValueError(f"Unsupported distribution chart: {kind}")
+    if not pd.api.types.is_numeric_dtype(df[value_col]):
+        raise ValueError(f"Column '{value_col}' must be numerical for a {kind} summary.")
+
+    vertical = group_col is not None
+    categories = list(pd.unique(df[group_col].dropna())) if vertical else [None]
+    colors = list(pd.unique(df[color_col].dropna())) if color_col else [None]
+    palette = px.colors.qualitative.Plotly
+    slot = 0.8 / len(colors)
+
+    keys = [col for col in (group_col, color_col) if col]
+    grouped = dict(iter(df.groupby(keys, sort=False, observed=True)[value_col])) if keys else {(): df[value_col]}
+
+    fig = go.Figure()
+    for j, color in enumerate(colors):
+        name = str(color) if color is not None else value_col
+        line_color = palette[j % len(palette)]
+        positions, stats = [], []
+        for i, category in enumerate(categories):
+            key = tuple(k for k in (category, color) if k is not None)
+            series = grouped.get(key)  # Grouping by a list yields tuple keys
+            if series is None:
+                continue
+            summary = distribution_summary(series.to_numpy(dtype=float), kde=(kind == 'violin'))
+            if summary is not None:
+                positions.append(i + (j - (len(colors) - 1) / 2) * slot)
+                stats.append(summary)
+        if not stats:
+            continue
+
+        def place(pos, vals):
+            return {'x': pos, 'y': vals} if vertical else {'x': vals, 'y': pos}
+
+        if kind == 'box':
+            fig.add_trace(go.Box(
+                **place(positions, None),
+                q1=[s['q1'] for s in stats], median=[s['median'] for s in stats],
+                q3=[s['q3'] for s in stats], mean=[s['mean'] for s in stats],
+                lowerfence=[s['lowerfence'] for s in stats],
+                upperfence=[s['upperfence'] for s in stats],
+                width=slot * 0.9, orientation='v' if vertical else 'h',
+                name=name, legendgroup=name, marker_color=line_color
+            ))
+        else:
+            for k, (pos, s) in enumerate(zip(positions, stats)):
+                half_width = s['kde_density'] / s['kde_density'].max() * slot * 0.45
+                outline = np.concatenate([pos + half_width, (pos - half_width)[::-1]])
+                grid = np.concatenate([s['kde_grid'], s['kde_grid'][::-1]])
+                fig.add_trace(go.Scatter(
+                    **place(outline, grid), mode='lines', fill='toself',
+                    line_color=line_color, name=name, legendgroup=name, showlegend=k == 0,
+                    hoveron='fills',
+                    text=f"n={s['count']}, median={s['median']:.4g}, q1={s['q1']:.4g}, q3={s['q3']:.4g}",
+                    hoverinfo='text'
+                ))
+
+        outlier_pos = np.concatenate([np.full(len(s['outliers']), pos) for pos, s in zip(positions, stats)])
+        outlier_vals = np.concatenate([s['outliers'] for s in stats])
+        if len(outlier_vals):
+            fig.add_trace(go.Scatter(
+                **place(outlier_pos, outlier_vals), mode='markers',
+                marker=dict(color=line_color, size=4), name=name, legendgroup=name, showlegend=False
+            ))
+
+    category_axis = dict(
+        tickvals=list(range(len(categories))),
+        ticktext=[str(c) for c in categories] if vertical else [value_col],
+        title=group_col or ''
+    )
+    value_axis = dict(title=value_col)
+    fig.update_layout(
+        title=title or f'{kind.title()} Chart',
+        xaxis=category_axis if vertical else value_axis,
+        yaxis=value_axis if vertical else category_axis,
+        showlegend=bool(color_col)
+    )
+    return fig
 
 def create_plotly_figure(
     df: pd.DataFrame,
@@ -63,7 +594,7 @@ def create_plotly_figure(
     
     # Basic chart parameters
     chart_params = {
-        'data_frame': df,
+        'data_frame': plain_categories(df, [c for c in (x_col, y_col, color_col) if c]),
         'x': x_col,
         'title': kwargs.get('title', f'{viz_type.title()} Chart'),
         'height': kwargs.get('height', 500),
@@ -85,7 +616,14 @@ def create_plotly_figure(
     elif viz_type == 'area':
         fig = px.area(**chart_params)
     elif viz_type == 'histogram':
-        fig = px.histogram(**chart_params)
+        fig = build_histogram_figure(
+            df, x_col, y_col, color_col,
+            bins=kwargs.get('bins'),
+            bin_width=kwargs.get('bin_width'),
+            log_scale=kwargs.get('log_scale', False),
+            title=chart_params['title'],
+            height=chart_params['height']
+        )
     elif viz_type == 'box':
         fig = px.box(**chart_params)
     elif viz_type == 'violin':
@@ -105,41 +643,153 @@ def sanitize_filename(filename: str) -> str:
     safe_chars = "".join(c if c.isalnum() or c in "._- " else "_" for c in filename)
     return safe_chars.strip()
 
+COLUMN_TYPE_LABELS = {
+    'int8': 'integer',
+    'int16': 'integer',
+    'int32': 'integer',
+    'int64': 'integer',
+    'float32': 'decimal',
+    'float64': 'decimal',
+    'object': 'text',
+    'bool': 'boolean',
+    'datetime64[ns]': 'date/time',
+    'category': 'category'
+}
+
+def logical_dtype(dtype):
+    """
+    The dtype pandas' default parse gives a column that optimize_dtypes
+    stored compactly (int8 -> int64, category -> object), so reported
+    types do not depend on how a frame happens to be stored.
+    """
+    if isinstance(dtype, pd.CategoricalDtype):
+        return np.dtype(object)
+    if isinstance(dtype, np.dtype) and dtype.kind == 'i':
+        return np.dtype(np.int64)
+    if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        return np.dtype(np.float64)
+    return dtype
+
+def logical_dtypes(df: pd.DataFrame) -> Dict[str, str]:
+    """Column name -> logical dtype name, as reported to the front-end"""
+    return {col: str(logical_dtype(dtype)) for col, dtype in df.dtypes.items()}
+
+def column_type_label(dtype) -> str:
+    """Map a pandas dtype to a human-readable type name (compact dtypes by their logical type)"""
+    dtype = logical_dtype(dtype)
+    return COLUMN_TYPE_LABELS.get(str(dtype), str(dtype))
+
 def get_column_types(df: pd.DataFrame) -> Dict[str, str]:
     """Get the data types of DataFrame columns in a human-readable format"""
-    type_map = {
-        'int64': 'integer',
-        'float64': 'decimal',
-        'object': 'text',
-        'bool': 'boolean',
-        'datetime64[ns]': 'date/time',
-        'category': 'category'
-    }
-    return {col: type_map.get(str(dtype), str(dtype)) for col, dtype in df.dtypes.items()}
+    return {col: column_type_label(dtype) for col, dtype in df.dtypes.items()}
+
+STATS_BATCH_COLUMNS = 64  # Columns profiled together in one 2D array
+SAMPLE_VALUES = 5
+
+def _numeric_batch_stats(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Column-wise min/max/mean/median/unique of a 2D array from one sort along
+    axis 0 (missing values, as NaN, sort to the end of each column).
+    """
+    if values.shape[0] == 0:
+        blank = np.full(values.shape[1], np.nan)
+        zeros = np.zeros(values.shape[1], dtype=np.int64)
+        return {'min': blank, 'max': blank, 'mean': blank, 'median': blank, 'unique': zeros, 'missing': zeros}
+
+    ordered = np.sort(values, axis=0)
+    if ordered.dtype.kind == 'f':
+        present = ~np.isnan(ordered)
+        sums = np.where(present, ordered, 0).sum(axis=0, dtype=np.float64)
+    else:
+        present = np.ones(ordered.shape, dtype=bool)
+        sums = ordered.sum(axis=0, dtype=np.float64)
+    counts = present.sum(axis=0)
+
+    cols = np.arange(ordered.shape[1])
+    empty = counts == 0
+    last = np.maximum(counts - 1, 0)
+    lower = ordered[last // 2, cols].astype(np.float64)
+    upper = ordered[counts // 2 - empty, cols].astype(np.float64)
+    changes = (ordered[1:] != ordered[:-1]) & present[1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'min': np.where(empty, np.nan, ordered[0, cols].astype(np.float64)),
+            'max': np.where(empty, np.nan, ordered[last, cols].astype(np.float64)),
+            'mean': np.where(empty, np.nan, sums / counts),
+            'median': np.where(empty, np.nan, (lower + upper) / 2),
+            'unique': changes.sum(axis=0) + ~empty,
+            'missing': ordered.shape[0] - counts
+        }
+
+def _text_stats(series: pd.Series) -> Tuple[int, int, bool]:
+    """
+    Missing count, distinct count and whether every value is a string, from
+    a single hash pass (factorize) over the column.
+    """
+    codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+    missing = int((codes < 0).sum())
+    all_text = missing == 0 and len(series) > 0 and all(isinstance(value, str) for value in uniques)
+    return missing, len(uniques), all_text
+
+def _sample_values(series: pd.Series) -> List[Any]:
+    """Up to SAMPLE_VALUES non-missing values at evenly spaced positions (deterministic)"""
+    values = series.dropna()
+    if values.empty:
+        return []
+    positions = np.linspace(0, len(values) - 1, min(SAMPLE_VALUES, len(values))).astype(int)
+    return values.iloc[positions].tolist()
 
 def get_column_stats(df: pd.DataFrame, columns: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
-    """Get basic statistics for specified columns"""
+    """
+    Get basic statistics for specified columns.
+    Numeric columns are profiled in batches of same-dtype columns with a
+    single sort per batch; text columns with a single factorize each.
+    """
     if columns is None:
         columns = df.columns.tolist()
-    
-    stats = {}
+    stats = {col: {'type': str(logical_dtype(df[col].dtype))} for col in columns}
+
+    numeric_groups: Dict[np.dtype, List[str]] = {}
+    text_cols, other_cols = [], []
     for col in columns:
-        col_stats = {
-            'type': str(df[col].dtype),
-            'missing': int(df[col].isna().sum()),
-            'unique': int(df[col].nunique())
-        }
-        
-        if pd.api.types.is_numeric_dtype(df[col]):
-            col_stats.update({
-                'min': float(df[col].min()),
-                'max': float(df[col].max()),
-                'mean': float(df[col].mean()),
-                'median': float(df[col].median())
-            })
-        elif pd.api.types.is_string_dtype(df[col]):
-            col_stats['sample_values'] = df[col].dropna().sample(min(5, len(df))).tolist()
-            
-        stats[col] = col_stats
-    
-    return stats
\ No newline at end of file
+        dtype = df[col].dtype
+        if pd.api.types.is_numeric_dtype(dtype):
+            # Bool and nullable extension columns are profiled as float64
+            native = isinstance(dtype, np.dtype) and dtype.kind in 'iuf'
+            numeric_groups.setdefault(dtype if native else np.dtype(np.float64), []).append(col)
+        elif pd.api.types.is_object_dtype(dtype) or dtype == 'string':
+            text_cols.append(col)
+        else:
+            other_cols.append(col)
+
+    for dtype, group in numeric_groups.items():
+        for start in range(0, len(group), STATS_BATCH_COLUMNS):
+            batch = group[start:start + STATS_BATCH_COLUMNS]
+            if dtype.kind == 'f':
+                values = df[batch].to_numpy(dtype=dtype, na_value=np.nan)
+            else:
+                values = df[batch].to_numpy(dtype=dtype)
+            results = _numeric_batch_stats(values)
+            for j, col in enumerate(batch):
+                stats[col].update({
+                    'missing': int(results['missing'][j]),
+                    'unique': int(results['unique'][j]),
+                    'min': float(results['min'][j]),
+                    'max': float(results['max'][j]),
+                    'mean': float(results['mean'][j]),
+                    'median': float(results['median'][j])
+                })
+
+    for col in text_cols:
+        missing, unique, all_text = _text_stats(df[col])
+        stats[col].update({'missing': missing, 'unique': unique})
+        if all_text or df[col].dtype == 'string':
+            stats[col]['sample_values'] = _sample_values(df[col])
+
+    for col in other_cols:
+        series = df[col]
+        stats[col].update({'missing': int(series.isna().sum()), 'unique': int(series.nunique())})
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            stats[col]['sample_values'] = _sample_values(series)
+
+    return stats
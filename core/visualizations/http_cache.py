@@ -0,0 +1,138 @@
+"""Conditional GET (ETag/304) and cached response compression for JSON endpoints"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Optional, Tuple
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # Fall back to gzip only
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024
+SAFE_METHODS = ('GET', 'HEAD')  # The only methods a matching If-None-Match turns into 304
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64MB
+
+
+def make_etag(*parts: Any) -> str:
+    """Derive a stable ETag value from JSON-serializable parts"""
+    raw = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha1(raw).hexdigest()
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with the negotiated content-coding"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+class ResponseBodyCache:
+    """Size-bounded LRU of encoded response bodies keyed by (etag, content-coding)"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[bytes, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[Tuple[bytes, str, str]]:
+        """Return (body, mimetype, content-coding) for key, if cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple[str, str], body: bytes, mimetype: str, encoding: str) -> None:
+        """Store an encoded body, evicting least recently used entries"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= len(self._entries.pop(key)[0])
+            self._entries[key] = (body, mimetype, encoding)
+            self.current_bytes += len(body)
+            while self.current_bytes > self.max_bytes:
+                _, (old_body, _, _) = self._entries.popitem(last=False)
+                self.current_bytes -= len(old_body)
+
+
+response_cache = ResponseBodyCache()
+
+
+def _negotiate_encoding() -> str:
+    """Pick the best content-coding the client accepts"""
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered) or 'identity'
+
+
+def _finish(response, etag: str, encoding: str):
+    """Attach validator (GET/HEAD only) and negotiation headers"""
+    if request.method in SAFE_METHODS:
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def conditional(etag_for: Callable[..., Optional[str]]):
+    """
+    Decorate a JSON view with ETag validation and cached compression.
+
+    etag_for receives the view arguments and returns an ETag for the current
+    request (or None to bypass caching). For GET/HEAD a matching
+    If-None-Match yields 304 without running the view; otherwise the encoded
+    body of a 200 response is kept per (etag, content-coding) so repeat hits
+    skip both the view and the compression.
+
+    Other methods (e.g. POST previews) only use the ETag as the body cache
+    key: it is not sent to the client, and a matching If-None-Match gets 412
+    as RFC 9110 section 13.1.2 requires.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = etag_for(*args, **kwargs)
+            if etag is None:
+                return view(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(etag):
+                if request.method not in SAFE_METHODS:
+                    return current_app.response_class(status=412)
+                response = current_app.response_class(status=304)
+                return _finish(response, etag, 'identity')
+
+            accepted = _negotiate_encoding()
+            cached = response_cache.get((etag, accepted))
+            if cached is not None:
+                body, mimetype, encoding = cached
+                return _finish(current_app.response_class(body, mimetype=mimetype), etag, encoding)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough:
+                return response
+
+            body = response.get_data()
+            encoding = accepted if len(body) >= MIN_COMPRESS_BYTES else 'identity'
+            body = compress(body, encoding)
+            response_cache.put((etag, accepted), body, response.mimetype, encoding)
+            response.set_data(body)
+            return _finish(response, etag, encoding)
+        return wrapper
+    return decorator
+
+
+def init_response_cache(app) -> None:
+    """Apply the configured memory budget to the response body cache"""
+    response_cache.max_bytes = app.config.get('RESPONSE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
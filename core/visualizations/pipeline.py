@@ -0,0 +1,147 @@
+"""Planning and execution of the preview filter → aggregate → sort → top-N steps"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from core.visualizations.helpers import FilterSet, aggregate_from_summary, summarize_groups
+
+# Order steps must run in; filters reference raw columns so they precede aggregation
+STEP_ORDER = {'filter': 0, 'aggregate': 1, 'sort': 2, 'limit': 3, 'topn': 2}
+
+
+class PreviewPlan:
+    """
+    The data steps of a preview as an ordered list that can be rewritten
+    before it runs.
+
+    Steps are added in any order; optimize() puts filters before aggregation
+    and fuses a sort followed by a limit into a single top-N selection.
+    execute() runs the plan against lazily loaded inputs and records the
+    strategy each step actually used, which explain() reports.
+    """
+
+    def __init__(self):
+        self.steps: List[Dict[str, Any]] = []
+
+    def filter(self, row_filter: FilterSet) -> 'PreviewPlan':
+        if row_filter:
+            self.steps.append({'step': 'filter', 'row_filter': row_filter})
+        return self
+
+    def aggregate(
+        self,
+        group_cols: List[str],
+        y_col: str,
+        func: str,
+        name: str,
+        cached_summary: Callable[[], pd.DataFrame],
+        label: Optional[str] = None
+    ) -> 'PreviewPlan':
+        """Aggregate y_col per group; cached_summary serves the unfiltered case"""
+        self.steps.append({
+            'step': 'aggregate', 'group_cols': group_cols, 'y_col': y_col, 'func': func,
+            'name': name, 'label': label or func, 'cached_summary': cached_summary
+        })
+        return self
+
+    def sort(self, column: str, ascending: bool = True) -> 'PreviewPlan':
+        self.steps.append({'step': 'sort', 'column': column, 'ascending': ascending})
+        return self
+
+    def limit(self, n: Optional[int]) -> 'PreviewPlan':
+        if n is not None:
+            self.steps.append({'step': 'limit', 'n': n})
+        return self
+
+    def optimize(self) -> 'PreviewPlan':
+        """Reorder steps into a valid sequence and fuse sort + limit into top-N"""
+        steps = sorted(self.steps, key=lambda step: STEP_ORDER[step['step']])
+        optimized: List[Dict[str, Any]] = []
+        for step in steps:
+            previous = optimized[-1] if optimized else None
+            if step['step'] == 'limit' and previous is not None and previous['step'] == 'sort':
+                optimized[-1] = {
+                    'step': 'topn', 'column': previous['column'],
+                    'ascending': previous['ascending'], 'n': step['n']
+                }
+            else:
+                optimized.append(step)
+        self.steps = optimized
+        return self
+
+    def execute(self, load_rows: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Run the plan. load_rows supplies the raw (projected) frame and is only
+        called if a step needs row-level data; an aggregation that comes first
+        is answered from its cached summary instead.
+        """
+        df: Optional[pd.DataFrame] = None
+        for step in self.steps:
+            if df is None and step['step'] != 'aggregate':
+                df = load_rows()
+            rows_in = len(df) if df is not None else None
+            df = getattr(self, f"_run_{step['step']}")(step, df)
+            step['rows_in'], step['rows_out'] = rows_in, len(df)
+        return df if df is not None else load_rows()
+
+    def explain(self) -> List[Dict[str, Any]]:
+        """JSON-friendly description of the steps and the strategies chosen"""
+        described = []
+        for step in self.steps:
+            entry = {key: value for key, value in step.items() if key not in ('row_filter', 'cached_summary')}
+            if step['step'] == 'filter':
+                entry['filters'] = step['row_filter'].filters
+            described.append(entry)
+        return described
+
+    def _run_filter(self, step: Dict[str, Any], df: pd.DataFrame) -> pd.DataFrame:
+        try:
+            return step['row_filter'].apply(df)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid filter: {str(e)}") from e
+
+    def _run_aggregate(self, step: Dict[str, Any], df: Optional[pd.DataFrame]) -> pd.DataFrame:
+        group_cols, y_col, func = step['group_cols'], step['y_col'], step['func']
+        if df is None:
+            step['source'] = 'cached summary'
+            summary = step['cached_summary']()
+        else:
+            step['source'] = 'rows'
+            summary = summarize_groups(df, group_cols, y_col)
+        if func != 'size' and 'sum' not in summary.columns:
+            raise ValueError(f"Y column '{y_col}' must be numerical for '{step['label']}' aggregation.")
+        return aggregate_from_summary(summary, group_cols, func, step['name'])
+
+    def _run_sort(self, step: Dict[str, Any], df: pd.DataFrame) -> pd.DataFrame:
+        if _is_sorted(df[step['column']], step['ascending']):
+            step['strategy'] = 'skipped (already ordered)'
+            return df
+        step['strategy'] = 'full sort'
+        return df.sort_values(by=step['column'], ascending=step['ascending'])
+
+    def _run_limit(self, step: Dict[str, Any], df: pd.DataFrame) -> pd.DataFrame:
+        return df.head(step['n'])
+
+    def _run_topn(self, step: Dict[str, Any], df: pd.DataFrame) -> pd.DataFrame:
+        column, ascending, n = step['column'], step['ascending'], step['n']
+        values = df[column]
+        if _is_sorted(values, ascending):
+            step['strategy'] = 'head (already ordered)'
+            return df.head(n)
+        # Partial selection is O(n) but drops missing values, so it is only
+        # equivalent to sort + head when enough non-missing values exist
+        selectable = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+        if n < len(df) and selectable and values.count() >= n:
+            step['strategy'] = 'partial selection'
+            return df.nsmallest(n, column) if ascending else df.nlargest(n, column)
+        step['strategy'] = 'full sort + head'
+        return df.sort_values(by=column, ascending=ascending).head(n)
+
+
+def _is_sorted(values: pd.Series, ascending: bool) -> bool:
+    """Whether values are already in the requested order (O(n) check)"""
+    try:
+        return values.is_monotonic_increasing if ascending else values.is_monotonic_decreasing
+    except TypeError:  # Mixed types that cannot be compared
+        return False
@@ -0,0 +1,153 @@
+"""Multi-visualization HTML reports with one shared plotly.js and deduplicated arrays"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import click
+from flask import current_app, render_template
+from flask.cli import with_appcontext
+from plotly.offline import get_plotlyjs
+from plotly.utils import PlotlyJSONEncoder
+
+from core.models import Visualization
+from core.visualizations.encoding import decode_figure
+
+logger = logging.getLogger(__name__)
+
+MIN_SHARED_ARRAY = 8  # Shorter arrays are cheaper inline than as references
+REF_KEY = '$ref'
+
+
+def select_visualizations(ids: Optional[Sequence[int]] = None, tag: Optional[str] = None) -> List[Visualization]:
+    """
+    Saved visualizations for a report: the given ids in the order given,
+    and/or every visualization carrying tag (most recently updated first).
+    """
+    selected: List[Visualization] = []
+    if ids:
+        by_id = {viz.id: viz for viz in Visualization.query.filter(Visualization.id.in_(ids)).all()}
+        selected.extend(by_id[viz_id] for viz_id in dict.fromkeys(ids) if viz_id in by_id)
+    if tag:
+        seen = {viz.id for viz in selected}
+        tagged = (
+            Visualization.query.filter(Visualization.tags.like(f"%{tag}%"))
+            .order_by(Visualization.updated_at.desc())
+            .all()
+        )
+        selected.extend(
+            viz for viz in tagged
+            if viz.id not in seen and tag in [t.strip() for t in viz.tags.split(',')]
+        )
+    return selected
+
+
+def _share_arrays(value: Any, arrays: Dict[str, Any]) -> Any:
+    """
+    Replace long data arrays inside a trace with {"$ref": digest}, collecting
+    the arrays by the digest of their JSON form.
+    """
+    if isinstance(value, dict):
+        return {key: _share_arrays(item, arrays) for key, item in value.items()}
+    if isinstance(value, list):
+        if len(value) >= MIN_SHARED_ARRAY and not any(isinstance(item, dict) for item in value):
+            raw = json.dumps(value, cls=PlotlyJSONEncoder, separators=(',', ':'))
+            digest = hashlib.sha1(raw.encode()).hexdigest()[:16]
+            arrays.setdefault(digest, raw)
+            return {REF_KEY: digest}
+        return [_share_arrays(item, arrays) for item in value]
+    return value
+
+
+def prepare_figure(visualization: Visualization) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Parse one saved figure and move its data arrays out into a digest-keyed
+    table (values already serialized), returning (figure entry, arrays).
+    Typed arrays are decoded to lists first, both for the embedded plotly.js
+    (which predates them) and so equal arrays share one entry.
+    """
+    arrays: Dict[str, str] = {}
+    config = decode_figure(json.loads(visualization.config))
+    figure = {
+        'data': [_share_arrays(trace, arrays) for trace in config.get('data', [])],
+        'layout': config.get('layout', {})
+    }
+    entry = {
+        'id': visualization.id,
+        'name': visualization.name,
+        'description': visualization.description or '',
+        'chart_type': visualization.chart_type,
+        'figure': figure
+    }
+    return entry, arrays
+
+
+def build_report(visualizations: Sequence[Visualization], title: str = 'Visualization report') -> Tuple[str, Dict[str, int]]:
+    """
+    Render a self-contained HTML report of visualizations. Every data array
+    is embedded once however many charts use it, and plotly.js once for all.
+    Returns (html, stats).
+    """
+    figures, arrays, references = [], {}, 0
+    for visualization in visualizations:
+        entry, figure_arrays = prepare_figure(visualization)
+        figures.append(entry)
+        references += len(figure_arrays)
+        arrays.update(figure_arrays)
+
+    # Arrays are already JSON; splice them in rather than parsing them back
+    arrays_json = '{' + ','.join(f'{json.dumps(key)}:{raw}' for key, raw in arrays.items()) + '}'
+    html = render_template(
+        'visualizations/report.html',
+        title=title,
+        generated_at=datetime.utcnow(),
+        figures=figures,
+        plotlyjs=get_plotlyjs(),
+        figures_json=_script_safe(json.dumps(figures, cls=PlotlyJSONEncoder)),
+        arrays_json=_script_safe(arrays_json),
+        plotly_config_json=_script_safe(json.dumps(current_app.config.get('PLOTLY_CONFIG', {})))
+    )
+    stats = {'visualizations': len(figures), 'arrays': len(arrays), 'array_references': references}
+    logger.info(f"Built report of {stats['visualizations']} visualizations sharing {stats['arrays']} arrays")
+    return html, stats
+
+
+def _script_safe(payload: str) -> str:
+    """Escape JSON for embedding inside a <script> element"""
+    return payload.replace('</', '<\\/')
+
+
+def parse_ids(raw: Optional[str]) -> List[int]:
+    """Parse a comma-separated id list such as '3,1,7'"""
+    if not raw:
+        return []
+    try:
+        return [int(part) for part in raw.split(',') if part.strip()]
+    except ValueError:
+        raise ValueError(f"Invalid visualization ids: {raw}")
+
+
+@click.command('report')
+@click.option('--ids', help='Comma-separated visualization ids, in report order.')
+@click.option('--tag', help='Include every visualization with this tag.')
+@click.option('--title', default='Visualization report', show_default=True)
+@click.option('--output', '-o', default='report.html', show_default=True, type=click.Path(dir_okay=False))
+@with_appcontext
+def report_command(ids, tag, title, output):
+    """Build one self-contained HTML report from saved visualizations."""
+    try:
+        visualizations = select_visualizations(parse_ids(ids), tag)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--ids')
+    if not visualizations:
+        raise click.UsageError('No visualizations matched; pass --ids and/or --tag.')
+
+    html, stats = build_report(visualizations, title)
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(html)
+    click.echo(
+        f"Wrote {output}: {stats['visualizations']} visualizations, "
+        f"{stats['arrays']} arrays embedded for {stats['array_references']} references"
+    )
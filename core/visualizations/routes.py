@@ -6,15 +6,39 @@ from flask import (
     request, 
     jsonify, 
     current_app,
-    abort, url_for, flash, redirect
+    abort, url_for, flash, redirect, send_from_directory
 )
 from werkzeug.utils import secure_filename
 import pandas as pd
 import plotly.express as px
 import json
 import os
+from functools import partial
+from concurrent.futures import TimeoutError as RenderTimeout
 from datetime import datetime
-from core.models import db, Visualization
+from typing import Any, Dict, List, Optional, Sequence
+from core.models import db, Dataset, Visualization
+from core.data.cache import dataset_cache, file_version
+from core.data.content import content_filename, find_duplicate, hash_file, save_hashed
+from core.data.dtypes import optimize_loaded
+from core.data.excel import list_sheets, read_excel_rows
+from core.data.jobs import Job, job_manager
+from core.data.quota import (
+    ANONYMOUS, adjust_storage, reconcile_due, reconcile_storage, release_storage,
+    reserve_storage, settle_storage, storage_report
+)
+from core.data.sidecar import read_sidecar, read_sidecar_head, remove_sidecar, sidecar_columns, write_sidecar
+from core.visualizations.helpers import (
+    FilterSet, build_distribution_figure, build_histogram_figure,
+    downsample, get_column_stats, get_column_types, logical_dtypes, plain_categories, summarize_groups
+)
+from core.visualizations.dashboard import dashboard_cache
+from core.visualizations.encoding import ENCODINGS, decode_figure, encode_figure, json_response
+from core.visualizations.export import EXPORT_FORMATS, export_options, export_renderer
+from core.visualizations.http_cache import conditional, make_etag
+from core.visualizations.pipeline import PreviewPlan
+from core.visualizations.report import build_report, parse_ids, select_visualizations
+from core.visualizations.thumbnails import remove_thumbnails, thumbnail_directory, write_thumbnail
 
 viz_bp = Blueprint("viz", __name__)
 
@@ -25,6 +49,7 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 UPLOAD_DIR = os.path.join(DATA_DIR, 'raw', 'uploaded')
 SAVED_VIZ_DIR = os.path.join(BASE_DIR, 'saved_visualizations')
+MAX_STORAGE_SPACE = 500 * 1024 * 1024  # 500MB total storage limit
 
 
 def allowed_file(filename: str) -> bool:
@@ -35,31 +60,231 @@ def allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in allowed_exts
 
 
-def load_dataframe(filepath: str, filename: str) -> pd.DataFrame:
+def resolve_data_path(filename: str) -> Optional[str]:
+    """
+    Locate a data file in UPLOAD_DIR, falling back to DATA_DIR.
+    Returns None if it exists in neither.
+    """
+    safe_name = secure_filename(filename)
+    for directory in (UPLOAD_DIR, DATA_DIR):
+        filepath = os.path.join(directory, safe_name)
+        if os.path.exists(filepath):
+            return filepath
+    return None
+
+
+def dataset_etag(filename: str, *params) -> Optional[str]:
+    """ETag for a response derived from a data file's version, selected sheet and request parameters"""
+    filepath = resolve_data_path(filename)
+    if filepath is None:
+        return None
+    return make_etag(file_version(filepath), selected_sheet(filename), *params)
+
+
+def load_dataframe(filepath: str, filename: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
     """
     Load a DataFrame from a CSV or Excel file at the given filepath.
+    Parsed frames are shared through the process-wide dataset cache, so the
+    result must not be modified in place. When columns is given only those
+    columns are read, preferring the columnar sidecar written at upload.
+    Frames are stored with compact dtypes (see core.data.dtypes).
+    """
+    if not columns:
+        return dataset_cache.get_or_load(filepath, lambda: optimize_loaded(read_dataframe(filepath, filename)))
+
+    columns = list(dict.fromkeys(columns))
+    full = dataset_cache.peek(filepath)
+    if full is not None:
+        return full[columns]
+    return dataset_cache.get_or_load(
+        filepath,
+        lambda: optimize_loaded(read_dataframe(filepath, filename, columns)),
+        variant=tuple(columns)
+    )
+
+
+def load_group_summary(filepath: str, filename: str, group_cols: List[str], y_column: str) -> pd.DataFrame:
+    """
+    Return the summarize_groups table for (file version, group columns, y),
+    computing it once from the referenced columns and caching it alongside
+    the parsed frames.
+    """
+    def loader():
+        df = load_dataframe(filepath, filename, columns=[*group_cols, y_column])
+        return summarize_groups(df, group_cols, y_column)
+
+    return dataset_cache.get_or_load(filepath, loader, variant=("summary", tuple(group_cols), y_column))
+
+
+def get_dataframe_columns(filepath: str, filename: str) -> List[str]:
+    """
+    List a data file's columns without loading its data, using the cached
+    frame or sidecar schema when available and the file header otherwise.
+    """
+    full = dataset_cache.peek(filepath)
+    if full is not None:
+        return full.columns.tolist()
+
+    sheet = selected_sheet(filename)
+    columns = sidecar_columns(filepath, sheet)
+    if columns is not None:
+        return columns
+
+    if filename.lower().endswith(".csv"):
+        return pd.read_csv(filepath, nrows=0).columns.tolist()
+    elif filename.lower().endswith((".xls", ".xlsx")):
+        return read_excel_rows(filepath, sheet, nrows=0).columns.tolist()
+    raise ValueError("Unsupported file type")
+
+
+def selected_sheet(filename: str) -> Optional[str]:
+    """The workbook sheet chosen for a dataset, or None for the first sheet (and for CSVs)"""
+    if not filename.lower().endswith((".xls", ".xlsx")):
+        return None
+    return db.session.query(Dataset.sheet_name).filter_by(filename=filename).scalar()
+
+
+def read_dataframe(filepath: str, filename: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
     """
+    Parse a data file from disk, bypassing the dataset cache.
+    An up-to-date Parquet sidecar is used when available; otherwise the
+    CSV/Excel file is parsed, restricted to columns if given. Workbooks are
+    read from the dataset's selected sheet (the first one by default).
+    """
+    sheet = selected_sheet(filename)
+    df = read_sidecar(filepath, columns, sheet)
+    if df is not None:
+        return df
+
+    usecols = list(columns) if columns else None
     if filename.lower().endswith(".csv"):
-        df = pd.read_csv(filepath)
+        df = pd.read_csv(filepath, usecols=usecols)
     elif filename.lower().endswith((".xls", ".xlsx")):
-        df = pd.read_excel(filepath)
+        df = read_excel_rows(filepath, sheet, usecols=usecols)
     else:
         raise ValueError("Unsupported file type")
     return df
 
 
+def read_head(filepath: str, filename: str, nrows: int) -> pd.DataFrame:
+    """
+    First nrows rows of a data file, from the cached frame, the sidecar's
+    leading batch or a partial parse, without loading the whole file.
+    """
+    full = dataset_cache.peek(filepath)
+    if full is not None:
+        return full.head(nrows)
+
+    sheet = selected_sheet(filename)
+    df = read_sidecar_head(filepath, nrows, sheet)
+    if df is not None:
+        return df
+
+    if filename.lower().endswith(".csv"):
+        return pd.read_csv(filepath, nrows=nrows)
+    elif filename.lower().endswith((".xls", ".xlsx")):
+        return read_excel_rows(filepath, sheet, nrows=nrows)
+    raise ValueError("Unsupported file type")
+
+
 @viz_bp.route("/files", methods=["GET"])
 def list_files():
     """
-    Lists all allowed CSV/Excel files in the data directory (DATA_DIR).
-    This can be used to populate a dropdown of existing data sources.
+    Lists data files from the dataset catalog (uploads plus files found in
+    DATA_DIR at startup), newest first. This can be used to populate a
+    dropdown of existing data sources.
+    """
+    rows = (
+        db.session.query(
+            Dataset.filename, Dataset.original_filename, Dataset.file_type,
+            Dataset.row_count, Dataset.file_size, Dataset.created_at
+        )
+        .order_by(Dataset.created_at.desc())
+        .all()
+    )
+    return jsonify({
+        "files": [row.filename for row in rows],
+        "datasets": [
+            {
+                "filename": row.filename,
+                "original_filename": row.original_filename,
+                "file_type": row.file_type,
+                "row_count": row.row_count,
+                "file_size": row.file_size,
+                "created_at": row.created_at.isoformat() if row.created_at else None
+            }
+            for row in rows
+        ]
+    })
+
+
+def sync_upload_catalog() -> int:
+    """
+    Register files already in UPLOAD_DIR or DATA_DIR that have no Dataset row
+    yet (e.g. uploads made before the catalog existed, or data files placed
+    in DATA_DIR by hand), and hash catalogued files that predate content
+    addressing so re-uploads of them are deduplicated. Only file metadata is
+    recorded; schema and stats are filled in when a file is next uploaded.
+    Returns the number of rows added.
     """
-    os.makedirs(DATA_DIR, exist_ok=True)
-    valid_files = []
-    for fname in os.listdir(DATA_DIR):
-        if allowed_file(fname):
-            valid_files.append(fname)
-    return jsonify({"files": valid_files})
+    known = {name for (name,) in db.session.query(Dataset.filename)}
+    added = 0
+    for directory in (UPLOAD_DIR, DATA_DIR):
+        if not os.path.isdir(directory):
+            continue
+        for fname in sorted(os.listdir(directory)):
+            filepath = os.path.join(directory, fname)
+            if fname in known or not os.path.isfile(filepath) or not allowed_file(fname):
+                continue
+            db.session.add(Dataset(
+                filename=fname,
+                original_filename=fname,
+                file_type=fname.rsplit(".", 1)[1].lower(),
+                file_size=os.path.getsize(filepath),
+                content_hash=hash_file(filepath),
+                created_at=datetime.utcfromtimestamp(os.path.getmtime(filepath))
+            ))
+            known.add(fname)
+            added += 1
+    for dataset in Dataset.query.filter(Dataset.content_hash.is_(None)):
+        filepath = resolve_data_path(dataset.filename)
+        if filepath is not None and os.path.isfile(filepath):
+            dataset.content_hash = hash_file(filepath)
+    db.session.commit()
+    return added
+
+
+def draw_thumbnail(viz_id: int, config: str) -> Optional[str]:
+    """Draw the card thumbnail for a saved config, returning its file name"""
+    colors = current_app.config.get("DEFAULT_VIZ_SETTINGS", {}).get("color_sequence")
+    return write_thumbnail(thumbnail_directory(current_app), viz_id, config, colors)
+
+
+def sync_thumbnails() -> int:
+    """
+    Draw thumbnails for saved visualizations that predate them (or whose
+    drawing failed), leaving updated_at untouched. Returns the number drawn.
+    """
+    drawn = {}
+    missing = db.session.query(Visualization.id, Visualization.config).filter(Visualization.thumbnail.is_(None))
+    for viz_id, config in missing.all():
+        thumbnail = draw_thumbnail(viz_id, config)
+        if thumbnail is not None:
+            Visualization.query.filter_by(id=viz_id).update(
+                {"thumbnail": thumbnail, "updated_at": Visualization.updated_at}, synchronize_session=False
+            )
+            drawn[viz_id] = thumbnail
+    db.session.commit()
+    if drawn:
+        dashboard_cache.invalidate()
+    for viz_id, thumbnail in drawn.items():
+        remove_thumbnails(thumbnail_directory(current_app), viz_id, keep=thumbnail)
+    return len(drawn)
+
+
+def thumbnail_url(filename: Optional[str]) -> Optional[str]:
+    """Static URL of a thumbnail file, or None when there is none"""
+    return url_for("static", filename=f"thumbnails/{filename}") if filename else None
 
 
 @viz_bp.route("/upload", methods=["POST"])
@@ -67,10 +292,11 @@ def upload_data():
     """
     Handles file uploads with improved validation, error handling, and storage management.
     Returns JSON about the file (columns, row count, etc.) so the front-end
-    can populate the UI.
+    can populate the UI. Files above ASYNC_UPLOAD_THRESHOLD (or sent with
+    async=1) are processed in the background: the response is 202 with a
+    job id to poll at /viz/jobs/<job_id>.
     """
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB limit
-    MAX_STORAGE_SPACE = 500 * 1024 * 1024  # 500MB total storage limit
 
     if "file" not in request.files:
         return jsonify({"error": "No file was provided in the request"}), 400
@@ -90,88 +316,399 @@ def upload_data():
         }), 400
 
     filename = secure_filename(file.filename)
+    original_filename = filename
     os.makedirs(UPLOAD_DIR, exist_ok=True)
     filepath = os.path.join(UPLOAD_DIR, filename)
 
-    # Check total storage usage
-    total_size = sum(os.path.getsize(os.path.join(UPLOAD_DIR, f)) 
-                    for f in os.listdir(UPLOAD_DIR) 
-                    if os.path.isfile(os.path.join(UPLOAD_DIR, f)))
-    if total_size + request.content_length > MAX_STORAGE_SPACE:
+    # Book the space in the storage ledger up front; the conditional update
+    # fails if the total would exceed the limit, even under concurrent uploads
+    owner = current_owner()
+    booking = reserve_storage(owner, request.content_length, MAX_STORAGE_SPACE)
+    if booking is None:
         return jsonify({"error": "Storage space limit exceeded. Please delete some files first."}), 400
 
-    # Handle duplicate filenames
-    base, ext = os.path.splitext(filename)
-    counter = 1
-    while os.path.exists(filepath):
-        filename = f"{base}_{counter}{ext}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-        counter += 1
-
+    # Stream to disk while hashing; identical content maps to the same stored
+    # file and catalog entry, so re-uploads skip parsing and profiling
     try:
-        # Save the uploaded file
-        file.save(filepath)
+        temp_path, digest, size = save_hashed(file.stream, UPLOAD_DIR)
+    except Exception as e:
+        release_storage(owner, request.content_length, booking)
+        return jsonify({"error": f"Error processing file: {upload_error_message(e)}"}), 400
 
-        # Load into a DataFrame to gather metadata and validate content
-        df = load_dataframe(filepath, filename)
-        
-        # Basic data validation
-        if len(df.columns) == 0:
-            raise ValueError("File contains no columns")
-        if len(df) == 0:
-            raise ValueError("File contains no data rows")
-
-        # Generate metadata
-        columns = df.columns.tolist()
-        dtypes = df.dtypes.astype(str).to_dict()
-        preview_data = df.head(5).to_dict(orient="records")
-        file_size = os.path.getsize(filepath)
+    duplicate = find_duplicate(digest, UPLOAD_DIR)
+    filename = duplicate.filename if duplicate else content_filename(original_filename, digest)
+    filepath = os.path.join(UPLOAD_DIR, filename)
+
+    if os.path.exists(filepath):
+        # Already stored (and booked) under this name
+        os.remove(temp_path)
+        release_storage(owner, request.content_length, booking)
+        if duplicate is not None and duplicate.column_info:
+            duplicate.last_used = datetime.utcnow()
+            db.session.commit()
+            return jsonify(stored_upload_metadata(duplicate, filepath))
+        # Catalogued without a profile yet: process it, but never delete a file
+        # that was stored before this request
+        booking = None
+        cleanup = None
+    else:
+        os.replace(temp_path, filepath)
+        # Replace the request-size estimate with the real size on disk; the
+        # booking stays open until process_upload catalogs the file
+        adjust_storage(owner, size - request.content_length, token=booking, filename=filename)
+        cleanup = partial(discard_upload, filepath, owner, booking)
 
+    # Large files (or clients that ask for it) are parsed and profiled on the
+    # worker pool so the request returns immediately with a job to poll
+    async_threshold = current_app.config.get("ASYNC_UPLOAD_THRESHOLD", 10 * 1024 * 1024)
+    if request.form.get("async") in ("1", "true") or request.content_length >= async_threshold:
+        job = job_manager.submit(
+            "upload", process_upload_job, filepath, filename, original_filename, owner, digest, booking,
+            on_failure=cleanup
+        )
         return jsonify({
-            "message": "File uploaded successfully",
+            "message": "File uploaded; processing in the background",
             "filename": filename,
-            "columns": columns,
-            "dtypes": dtypes,
-            "row_count": len(df),
-            "preview": preview_data,
-            "file_size": file_size,
-            "file_size_formatted": f"{file_size / (1024*1024):.2f}MB"
-        })
+            "job_id": job.id,
+            "status_url": url_for("viz.get_job", job_id=job.id)
+        }), 202
+
+    try:
+        metadata = process_upload(filepath, filename, original_filename, owner, digest, booking=booking)
     except Exception as e:
         # Clean up partially saved file if something goes wrong
-        if os.path.exists(filepath):
-            os.remove(filepath)
-        
-        error_message = str(e)
-        if "memory" in error_message.lower():
-            error_message = "File is too large to process. Please try a smaller file."
-        elif "decode" in error_message.lower():
-            error_message = "Unable to read file. Please ensure it's a valid CSV/Excel file with proper encoding."
-            
-        return jsonify({"error": f"Error processing file: {error_message}"}), 400
+        if cleanup is not None:
+            cleanup()
+        return jsonify({"error": f"Error processing file: {upload_error_message(e)}"}), 400
+
+    schedule_storage_reconcile()
+    return jsonify(metadata)
+
+
+def process_upload(
+    filepath: str,
+    filename: str,
+    original_filename: str,
+    owner: str = ANONYMOUS,
+    content_hash: Optional[str] = None,
+    job: Optional[Job] = None,
+    booking: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Parse, validate and profile a saved upload, and record it in the dataset
+    catalog. Returns the metadata the front-end needs (columns, row count,
+    etc.), reporting progress to job when running in the background. booking
+    is the file's storage booking token, settled in the same commit as its
+    catalog row.
+    """
+    report = job.report if job else (lambda progress, stage: None)
+
+    # Load into a DataFrame to gather metadata and validate content
+    report(10, "parsing")
+    df = load_dataframe(filepath, filename)
+    
+    # Basic data validation
+    report(50, "validating")
+    if len(df.columns) == 0:
+        raise ValueError("File contains no columns")
+    if len(df) == 0:
+        raise ValueError("File contains no data rows")
+
+    # Keep a typed columnar copy so later reads skip the CSV/Excel parse
+    report(70, "writing columnar copy")
+    sheet = selected_sheet(filename)
+    write_sidecar(df, filepath, sheet)
+
+    # Generate metadata
+    report(90, "profiling")
+    columns = df.columns.tolist()
+    dtypes = logical_dtypes(df)
+    preview_data = df.head(5).to_dict(orient="records")
+    file_size = os.path.getsize(filepath)
+
+    # A catalogued duplicate keeps its created_at (and its place among recent datasets)
+    dataset = Dataset.query.filter_by(filename=filename).first()
+    if dataset is None:
+        dataset = Dataset(filename=filename, created_at=datetime.utcnow())
+    dataset.original_filename = original_filename
+    dataset.file_type = filename.rsplit(".", 1)[1].lower()
+    dataset.row_count = len(df)
+    dataset.file_size = file_size
+    dataset.owner = owner
+    dataset.content_hash = content_hash or hash_file(filepath)
+    dataset.column_info = json.dumps({
+        "types": get_column_types(df),
+        "stats": get_column_stats(df)
+    }, default=str)
+    db.session.add(dataset)
+    if booking is not None:
+        settle_storage(owner, booking)
+    db.session.commit()
+    dashboard_cache.invalidate()
+
+    result = {
+        "message": "File uploaded successfully",
+        "filename": filename,
+        "columns": columns,
+        "dtypes": dtypes,
+        "row_count": len(df),
+        "preview": preview_data,
+        "file_size": file_size,
+        "file_size_formatted": f"{file_size / (1024*1024):.2f}MB"
+    }
+    if filename.lower().endswith((".xls", ".xlsx")):
+        result["sheets"] = list_sheets(filepath)
+        result["sheet"] = sheet
+    return result
+
+
+def stored_upload_metadata(dataset: Dataset, filepath: str) -> Dict[str, Any]:
+    """
+    Upload response for a file that is already catalogued, built from its
+    saved profile instead of reparsing it.
+    """
+    column_info = json.loads(dataset.column_info)
+    preview_data = read_head(filepath, dataset.filename, 5).to_dict(orient="records")
+    return {
+        "message": "File already uploaded",
+        "filename": dataset.filename,
+        "deduplicated": True,
+        "columns": list(column_info.get("types", {})),
+        "dtypes": {col: stats.get("type") for col, stats in column_info.get("stats", {}).items()},
+        "row_count": dataset.row_count,
+        "preview": preview_data,
+        "file_size": dataset.file_size,
+        "file_size_formatted": f"{(dataset.file_size or 0) / (1024*1024):.2f}MB"
+    }
+
+
+def process_upload_job(
+    job: Job,
+    filepath: str,
+    filename: str,
+    original_filename: str,
+    owner: str,
+    content_hash: str,
+    booking: Optional[str] = None
+) -> Dict[str, Any]:
+    """Background variant of process_upload with user-facing error messages"""
+    try:
+        return process_upload(filepath, filename, original_filename, owner, content_hash, job, booking)
+    except Exception as e:
+        raise ValueError(f"Error processing file: {upload_error_message(e)}") from e
+
+
+def discard_upload(filepath: str, owner: Optional[str] = None, booking: Optional[str] = None) -> None:
+    """
+    Remove a failed upload along with its catalog row, cached frames and
+    sidecar, returning its space to owner's storage booking if given
+    (through the upload's booking token when it was never catalogued).
+    """
+    db.session.rollback()
+    Dataset.query.filter_by(filename=os.path.basename(filepath)).delete()
+    db.session.commit()
+    dashboard_cache.invalidate()
+    if os.path.exists(filepath):
+        if owner is not None:
+            release_storage(owner, os.path.getsize(filepath), booking)
+        os.remove(filepath)
+    dataset_cache.invalidate(filepath)
+    remove_sidecar(filepath)
+
+
+def upload_error_message(e: Exception) -> str:
+    """Translate common parsing failures into friendlier messages"""
+    error_message = str(e)
+    if "memory" in error_message.lower():
+        error_message = "File is too large to process. Please try a smaller file."
+    elif "decode" in error_message.lower():
+        error_message = "Unable to read file. Please ensure it's a valid CSV/Excel file with proper encoding."
+    return error_message
+
+
+def current_owner() -> str:
+    """Owner recorded for uploads: the authenticated remote user, if any"""
+    return request.remote_user or ANONYMOUS
+
+
+def storage_directories() -> List[str]:
+    """Directories holding files tracked by the Dataset catalog"""
+    return [UPLOAD_DIR, current_app.config.get("UPLOAD_FOLDER", "uploads"), DATA_DIR]
+
+
+_reconcile_job: Optional[Job] = None
+
+
+def schedule_storage_reconcile() -> None:
+    """
+    Queue a background rebuild of the storage ledger from disk when the last
+    one is older than STORAGE_RECONCILE_SECONDS and none is already running.
+    """
+    global _reconcile_job
+    if _reconcile_job is not None and _reconcile_job.status in ("queued", "running"):
+        return
+    if reconcile_due(current_app.config.get("STORAGE_RECONCILE_SECONDS", 60 * 60)):
+        directories = storage_directories()
+        reservation_seconds = current_app.config.get("STORAGE_RESERVATION_SECONDS", 6 * 60 * 60)
+        _reconcile_job = job_manager.submit(
+            "reconcile", lambda job: reconcile_storage(directories, reservation_seconds)
+        )
+
+
+@viz_bp.route("/storage", methods=["GET"])
+def storage_usage():
+    """
+    Storage ledger: overall usage against the limit, per-owner totals and the
+    largest datasets.
+    """
+    report = storage_report()
+    report["limit"] = MAX_STORAGE_SPACE
+    return jsonify(report)
+
+
+@viz_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id: str):
+    """
+    Report status, progress and (once finished) the result of a background job.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job not found: {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+
+@viz_bp.route("/sheets/<filename>", methods=["GET"])
+def get_sheets(filename: str):
+    """
+    List the sheets of an uploaded workbook and the one currently selected
+    (None means the first sheet).
+    """
+    filepath = resolve_data_path(filename)
+    if filepath is None:
+        return jsonify({"error": f"File not found: {filename}"}), 404
+    filename = os.path.basename(filepath)
+    if not filename.lower().endswith((".xls", ".xlsx")):
+        return jsonify({"error": "Only Excel workbooks have sheets"}), 400
+    return jsonify({"filename": filename, "sheets": list_sheets(filepath), "sheet": selected_sheet(filename)})
+
+
+@viz_bp.route("/sheets/<filename>", methods=["POST"])
+def select_sheet(filename: str):
+    """
+    Switch a workbook dataset to another sheet. Expects JSON {"sheet": name}.
+    The sheet is parsed once and written to the columnar sidecar, so later
+    reads of the dataset come from that sheet without reparsing the workbook.
+    """
+    filepath = resolve_data_path(filename)
+    if filepath is None:
+        return jsonify({"error": f"File not found: {filename}"}), 404
+    filename = os.path.basename(filepath)
+    if not filename.lower().endswith((".xls", ".xlsx")):
+        return jsonify({"error": "Only Excel workbooks have sheets"}), 400
+    dataset = Dataset.query.filter_by(filename=filename).first()
+    if dataset is None:
+        return jsonify({"error": f"Dataset not found: {filename}"}), 404
+
+    sheet = (request.get_json(silent=True) or {}).get("sheet")
+    sheets = list_sheets(filepath)
+    if sheet not in sheets:
+        return jsonify({"error": f"Unknown sheet: {sheet}", "sheets": sheets}), 400
+
+    try:
+        df = optimize_loaded(read_excel_rows(filepath, sheet))
+    except Exception as e:
+        return jsonify({"error": f"Error reading sheet: {upload_error_message(e)}"}), 400
+    if len(df.columns) == 0 or len(df) == 0:
+        return jsonify({"error": f"Sheet {sheet} contains no data"}), 400
+
+    # The first sheet is stored as None so existing sidecars stay valid
+    stored = sheet if sheet != sheets[0] else None
+    write_sidecar(df, filepath, stored)
+    dataset_cache.invalidate(filepath)
+    dataset.sheet_name = stored
+    dataset.row_count = len(df)
+    dataset.column_info = json.dumps({
+        "types": get_column_types(df),
+        "stats": get_column_stats(df)
+    }, default=str)
+    db.session.commit()
+    dashboard_cache.invalidate()
+
+    return jsonify({
+        "filename": filename,
+        "sheet": sheet,
+        "columns": df.columns.tolist(),
+        "dtypes": logical_dtypes(df),
+        "row_count": len(df),
+        "preview": df.head(5).to_dict(orient="records")
+    })
 
 
 @viz_bp.route("/data/<path:filename>", methods=["GET"])
+@conditional(lambda filename: dataset_etag(filename, request.query_string.decode()))
 def get_data(filename: str):
     """
     Fetch columns and data for a selected file from ../data/raw/uploaded.
     Useful if the user picks from the dropdown or from a previously uploaded file.
+    Optional query parameters page through the data instead of returning it all:
+      - offset, limit: row window (limit capped at DATA_PAGE_MAX_ROWS)
+      - columns: comma-separated subset of columns to return
+      - orient: 'records' (default) or 'columns' for {column: [values]}
     """
+    paged = any(arg in request.args for arg in ("offset", "limit", "columns", "orient"))
     try:
         safe_name = secure_filename(filename)
-        filepath = os.path.join(UPLOAD_DIR, safe_name)
-        if not os.path.exists(filepath):
-            # Optionally check the main DATA_DIR as well
-            alt_path = os.path.join(DATA_DIR, safe_name)
-            if os.path.exists(alt_path):
-                filepath = alt_path
-            else:
-                return jsonify({"error": f"File not found: {filename}"}), 404
-
-        df = load_dataframe(filepath, safe_name)
+        filepath = resolve_data_path(filename)
+        if filepath is None:
+            return jsonify({"error": f"File not found: {filename}"}), 404
+
+        if not paged:
+            df = load_dataframe(filepath, safe_name)
+            return jsonify({
+                "columns": df.columns.tolist(),
+                "data": df.to_dict(orient="records"),
+                "total_rows": len(df)
+            })
+
+        max_rows = current_app.config.get("DATA_PAGE_MAX_ROWS", 10000)
+        try:
+            offset = int(request.args.get("offset", 0))
+            limit = int(request.args.get("limit", max_rows))
+        except ValueError:
+            return jsonify({"error": "offset and limit must be integers."}), 400
+        if offset < 0 or limit <= 0:
+            return jsonify({"error": "offset must be >= 0 and limit must be positive."}), 400
+        limit = min(limit, max_rows)
+
+        orient = request.args.get("orient", "records")
+        if orient not in ("records", "columns"):
+            return jsonify({"error": "orient must be 'records' or 'columns'."}), 400
+
+        columns = [col for col in request.args.get("columns", "").split(",") if col]
+        if columns:
+            available_columns = get_dataframe_columns(filepath, safe_name)
+            missing = [col for col in columns if col not in available_columns]
+            if missing:
+                return jsonify({"error": f"Columns not found in dataset: {', '.join(missing)}"}), 400
+
+        df = load_dataframe(filepath, safe_name, columns=columns or None)
+        page = df.iloc[offset:offset + limit]
+        # NaN is not valid JSON; send nulls instead
+        page = page.astype(object).where(page.notna(), None)
+
+        if orient == "columns":
+            data = {col: page[col].tolist() for col in page.columns}
+        else:
+            data = page.to_dict(orient="records")
+
         return jsonify({
-            "columns": df.columns.tolist(),
-            "data": df.to_dict(orient="records")
+            "columns": page.columns.tolist(),
+            "data": data,
+            "orient": orient,
+            "offset": offset,
+            "limit": limit,
+            "returned_rows": len(page),
+            "total_rows": len(df)
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 400
@@ -231,8 +768,30 @@ SUPPORTED_CHARTS = {
     "violin": px.violin
 }
 
+# Chart types whose previews may be reduced with the maxPoints option
+DOWNSAMPLED_CHARTS = {"line", "scatter"}
+
+
+def use_distribution_summary(summary_option, df: pd.DataFrame) -> bool:
+    """
+    Decide whether a box/violin preview should be drawn from precomputed
+    summaries. 'auto' switches to summaries above DISTRIBUTION_SUMMARY_THRESHOLD rows.
+    """
+    if summary_option == "auto":
+        return len(df) > current_app.config.get("DISTRIBUTION_SUMMARY_THRESHOLD", 5000)
+    return bool(summary_option)
+
+
+def preview_etag() -> Optional[str]:
+    """ETag for a preview: the dataset version plus the full request body"""
+    data = request.get_json(silent=True) or {}
+    if not data.get("filename"):
+        return None
+    return dataset_etag(data["filename"], data, request.query_string.decode())
+
 
 @viz_bp.route("/preview", methods=["POST"])
+@conditional(preview_etag)
 def preview():
     """
     Generate a visualization preview based on user-selected settings.
@@ -243,6 +802,17 @@ def preview():
       - yColumn (optional for some chart types)
       - yAggregation (e.g., 'sum', 'avg', 'count', 'min', 'max', 'none')
       - groupBy (optional)
+      - filters (optional): list of {column, operator, value[, caseSensitive]}
+        applied to the rows before aggregation, as one combined mask
+      - maxPoints (optional, line/scatter): point budget for server-side downsampling
+      - downsampleMethod (optional): 'auto', 'lttb' or 'minmax'
+      - bins, binWidth, logScale (optional, histogram): server-side binning options
+      - summary (optional, box/violin): true, false or 'auto' to draw precomputed
+        quartiles/KDE traces instead of raw observations
+      - encoding (optional): 'json' (default) or 'b64' for base64 typed arrays
+      - explain (optional): include the executed data plan under 'plan'
+    Responses carry an ETag; resending it in If-None-Match returns 304 while
+    the dataset and request are unchanged.
     """
     data = request.get_json() or {}
     filename = data.get("filename")
@@ -254,33 +824,43 @@ def preview():
     top_n = data.get("topN", None)
     sort_column = data.get("sortColumn", "")
     sort_order = data.get("sortOrder", "asc")
+    max_points = data.get("maxPoints", None)
+    downsample_method = data.get("downsampleMethod", "auto")
+    encoding = data.get("encoding", request.args.get("encoding", "json"))
+
+    try:
+        row_filter = FilterSet(data.get("filters"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid filter: {str(e)}"}), 400
 
     if not (filename and viz_type and x_column):
         return jsonify({"error": "Missing required parameters (filename, vizType, xColumn)."}), 400
+    if encoding not in ENCODINGS:
+        return jsonify({"error": f"Unsupported encoding: {encoding}"}), 400
 
     try:
         safe_name = secure_filename(filename)
-        filepath = os.path.join(UPLOAD_DIR, safe_name)
-        if not os.path.exists(filepath):
-            alt_path = os.path.join(DATA_DIR, safe_name)
-            if os.path.exists(alt_path):
-                filepath = alt_path
-            else:
-                return jsonify({"error": f"File not found: {filename}"}), 404
-
-        df = load_dataframe(filepath, safe_name)
+        filepath = resolve_data_path(filename)
+        if filepath is None:
+            return jsonify({"error": f"File not found: {filename}"}), 404
 
         if viz_type not in SUPPORTED_CHARTS:
             return jsonify({"error": f"Unsupported visualization type: {viz_type}"}), 400
 
-        if x_column not in df.columns:
+        # Validate against the schema first so only referenced columns are loaded
+        available_columns = get_dataframe_columns(filepath, safe_name)
+        if x_column not in available_columns:
             return jsonify({"error": f"Selected X column '{x_column}' not found in dataset."}), 400
-        if y_column and y_column not in df.columns:
+        if y_column and y_column not in available_columns:
             return jsonify({"error": f"Selected Y column '{y_column}' not found in dataset."}), 400
-        if group_by_column and group_by_column not in df.columns:
+        if group_by_column and group_by_column not in available_columns:
             return jsonify({"error": f"Group By column '{group_by_column}' not found in dataset."}), 400
+        missing_filter_columns = [col for col in row_filter.columns if col not in available_columns]
+        if missing_filter_columns:
+            return jsonify({"error": f"Filter column '{missing_filter_columns[0]}' not found in dataset."}), 400
+
+        referenced_columns = [col for col in (x_column, y_column, group_by_column) if col]
 
-        df_for_plot = df.copy()
         agg_map = {
             "none": None,
             "sum": "sum",
@@ -291,54 +871,88 @@ def preview():
         }
         agg_func = agg_map.get(y_aggregation, None)
 
-        # Aggregation Logic
+        # Top N validation
+        if top_n is not None:
+            try:
+                top_n = int(top_n)
+                if top_n <= 0:
+                    return jsonify({"error": "Top N must be a positive integer."}), 400
+            except ValueError:
+                return jsonify({"error": "Top N must be a positive integer."}), 400
+
+        # Plan the data steps: filters run on the raw rows as one mask, then
+        # aggregation, then sort + top-N (fused into a partial selection)
+        plan = PreviewPlan().filter(row_filter)
+        output_columns = referenced_columns
         if y_column and agg_func:
             group_cols = [x_column]
             if group_by_column:
                 group_cols.append(group_by_column)
 
-            if y_aggregation == "count":
-                df_agg = df_for_plot.groupby(group_cols).size().reset_index(name="Count")
-                y_column = "Count"
-            elif agg_func in ["sum", "mean", "min", "max"]:
-                if not pd.api.types.is_numeric_dtype(df[y_column]):
-                    return jsonify({"error": f"Y column '{y_column}' must be numerical for '{y_aggregation}' aggregation."}), 400
-                df_agg = df_for_plot.groupby(group_cols)[y_column].agg(agg_func).reset_index()
-                new_y_column_name = f"{y_column}_{y_aggregation}"
-                df_agg.rename(columns={y_column: new_y_column_name}, inplace=True)
-                y_column = new_y_column_name
-            else:
-                df_agg = df_for_plot
-            df_for_plot = df_agg
+            # Aggregations are derived from a cached per-group summary, so
+            # switching between sum/avg/min/max never rescans the raw rows;
+            # filtered rows are summarized per request
+            value_column = y_column
+            y_column = "Count" if y_aggregation == "count" else f"{value_column}_{y_aggregation}"
+            plan.aggregate(
+                group_cols, value_column,
+                "size" if y_aggregation == "count" else agg_func,
+                y_column,
+                cached_summary=lambda: load_group_summary(filepath, safe_name, group_cols, value_column),
+                label=y_aggregation
+            )
+            output_columns = [*group_cols, y_column]
 
         # Sort Logic
         if sort_column == "x_column":
             sort_column = x_column
         elif sort_column == "y_column" and y_column:
             sort_column = y_column
-        elif sort_column == "count" and "Count" in df_for_plot.columns:
+        elif sort_column == "count" and "Count" in output_columns:
             sort_column = "Count"
 
-        if sort_column and sort_column in df_for_plot.columns:
-            ascending = True if sort_order == "asc" else False
-            df_for_plot = df_for_plot.sort_values(by=sort_column, ascending=ascending)
+        if sort_column and sort_column in output_columns:
+            plan.sort(sort_column, ascending=sort_order == "asc")
         else:
-            # Optional: Default sorting behavior
-            df_for_plot = df_for_plot.sort_values(by=x_column, ascending=True)
+            # Default sorting behavior
+            plan.sort(x_column, ascending=True)
+        plan.limit(top_n)
 
-        # Top N Logic
-        if top_n is not None:
+        load_columns = list(dict.fromkeys([*referenced_columns, *row_filter.columns]))
+        try:
+            # Every step returns a new frame (or skips), so the cached frame is never mutated
+            df_for_plot = plan.optimize().execute(
+                lambda: load_dataframe(filepath, safe_name, columns=load_columns)
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Downsampling Logic
+        downsampling = None
+        if max_points is not None and viz_type in DOWNSAMPLED_CHARTS and y_column in df_for_plot.columns:
             try:
-                top_n = int(top_n)
-                if top_n <= 0:
-                    return jsonify({"error": "Top N must be a positive integer."}), 400
-            except ValueError:
-                return jsonify({"error": "Top N must be a positive integer."}), 400
+                max_points = int(max_points)
+                if max_points < 3:
+                    raise ValueError
+            except (TypeError, ValueError):
+                return jsonify({"error": "maxPoints must be an integer of at least 3."}), 400
+            if downsample_method not in ("auto", "lttb", "minmax"):
+                return jsonify({"error": f"Unsupported downsampling method: {downsample_method}"}), 400
 
-            # Limit the DataFrame to Top N rows
-            df_for_plot = df_for_plot.head(top_n)
+            original_points = len(df_for_plot)
+            df_for_plot, method = downsample(
+                df_for_plot, x_column, y_column, max_points,
+                method=downsample_method, group_col=group_by_column or None
+            )
+            downsampling = {
+                "method": method,
+                "original_points": original_points,
+                "returned_points": len(df_for_plot),
+                "dropped_points": original_points - len(df_for_plot)
+            }
 
         # Build Plotly figure
+        df_for_plot = plain_categories(df_for_plot, [x_column, y_column, group_by_column])
         chart_func = SUPPORTED_CHARTS[viz_type]
         chart_kwargs = {"x": x_column}
 
@@ -347,9 +961,46 @@ def preview():
         if group_by_column:
             chart_kwargs["color"] = group_by_column
 
-        fig = chart_func(df_for_plot, **chart_kwargs, title=f"{viz_type.title()} Chart")
-        fig_json = json.loads(fig.to_json())
-        return jsonify({"chartData": fig_json})
+        if viz_type == "histogram":
+            try:
+                bins = int(data["bins"]) if data.get("bins") else None
+                bin_width = float(data["binWidth"]) if data.get("binWidth") else None
+                if (bins is not None and bins <= 0) or (bin_width is not None and bin_width <= 0):
+                    raise ValueError
+            except (TypeError, ValueError):
+                return jsonify({"error": "bins and binWidth must be positive numbers."}), 400
+            fig = build_histogram_figure(
+                df_for_plot, x_column,
+                y_col=chart_kwargs.get("y"),
+                color_col=group_by_column or None,
+                bins=bins,
+                bin_width=bin_width,
+                log_scale=bool(data.get("logScale", False)),
+                title=f"{viz_type.title()} Chart"
+            )
+        elif viz_type in ("box", "violin") and use_distribution_summary(data.get("summary", "auto"), df_for_plot):
+            value_column = chart_kwargs.get("y", x_column)
+            if not pd.api.types.is_numeric_dtype(df_for_plot[value_column]):
+                return jsonify({"error": f"Column '{value_column}' must be numerical for a {viz_type} summary."}), 400
+            fig = build_distribution_figure(
+                df_for_plot, viz_type,
+                value_col=value_column,
+                group_col=x_column if "y" in chart_kwargs else None,
+                color_col=group_by_column or None,
+                title=f"{viz_type.title()} Chart"
+            )
+        else:
+            fig = chart_func(df_for_plot, **chart_kwargs, title=f"{viz_type.title()} Chart")
+        if encoding == "b64":
+            # Numeric arrays go straight from numpy buffers to base64, serialized once
+            response = {"chartData": encode_figure(fig.to_plotly_json()), "encoding": encoding}
+        else:
+            response = {"chartData": json.loads(fig.to_json())}
+        if downsampling:
+            response["downsampling"] = downsampling
+        if data.get("explain"):
+            response["plan"] = plan.explain()
+        return json_response(response)
 
     except Exception as e:
         return jsonify({"error": f"Failed to generate preview: {str(e)}"}), 500
@@ -362,9 +1013,9 @@ def index():
     """
     Display the visualization index page with all saved visualizations.
     """
-    visualizations = Visualization.query.order_by(Visualization.updated_at.desc()).all()
+    visualizations = Visualization.summary_query().order_by(Visualization.updated_at.desc()).all()
     return render_template(
-        "visualizations/index.html",
+        "index.html",
         recent_vizs=visualizations
     )
 
@@ -385,6 +1036,10 @@ def save_viz():
         return jsonify({'error': 'Missing visualization configuration'}), 400
 
     try:
+        # Store plain arrays: exports and reports bundle a plotly.js that
+        # predates typed arrays
+        if isinstance(config, dict):
+            config = decode_figure(config)
         # Ensure the config is valid JSON
         config_str = json.dumps(config)
         
@@ -407,11 +1062,17 @@ def save_viz():
             )
             db.session.add(visualization)
 
+        db.session.flush()  # New rows need their id for the thumbnail name
+        visualization.thumbnail = draw_thumbnail(visualization.id, config_str)
         db.session.commit()
+        dashboard_cache.invalidate()
+        # Older thumbnails go only once the row no longer points at them
+        remove_thumbnails(thumbnail_directory(current_app), visualization.id, keep=visualization.thumbnail)
 
         return jsonify({
             'success': True,
             'id': visualization.id,
+            'thumbnail_url': thumbnail_url(visualization.thumbnail),
             'message': 'Visualization saved successfully'
         })
 
@@ -419,11 +1080,113 @@ def save_viz():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def visualization_etag(viz_id: int) -> Optional[str]:
+    """ETag for a saved visualization, based on its last update time and thumbnail"""
+    row = db.session.query(Visualization.updated_at, Visualization.thumbnail).filter_by(id=viz_id).first()
+    if row is None:
+        return None
+    return make_etag(viz_id, row.updated_at, row.thumbnail, request.query_string.decode())
+
+
+def visualization_list_etag() -> str:
+    """
+    ETag for the visualization list; changes on any save or delete, and when
+    sync_thumbnails fills in thumbnails (which leaves updated_at alone)
+    """
+    count, latest, max_id, thumbnails = db.session.query(
+        db.func.count(Visualization.id),
+        db.func.max(Visualization.updated_at),
+        db.func.max(Visualization.id),
+        db.func.count(Visualization.thumbnail)
+    ).one()
+    return make_etag(count, latest, max_id, thumbnails)
+
+
 @viz_bp.route('/<int:viz_id>', methods=['GET'])
+@conditional(visualization_etag)
 def get_visualization(viz_id):
-    """Get a specific visualization by ID"""
+    """Get a specific visualization by ID (?encoding=b64 for typed-array traces)"""
+    visualization = Visualization.query.get_or_404(viz_id)
+    encoding = request.args.get('encoding', 'json')
+    if encoding not in ENCODINGS:
+        return jsonify({'error': f'Unsupported encoding: {encoding}'}), 400
+
+    viz_dict = visualization.to_dict()
+    if encoding == 'b64' and isinstance(viz_dict['config'], dict):
+        viz_dict['config'] = encode_figure(viz_dict['config'])
+        viz_dict['encoding'] = encoding
+        return json_response(viz_dict)
+    return jsonify(viz_dict)
+
+@viz_bp.route('/<int:viz_id>/export/<fmt>', methods=['GET'])
+def export_visualization(viz_id, fmt):
+    """
+    Download a saved visualization as PNG, SVG or standalone HTML, rendered
+    server-side. Optional query parameters for images: width, height (pixels,
+    up to EXPORT_MAX_DIMENSION) and scale. Renders are cached on disk per
+    config and options, so repeat downloads are served as static files;
+    ?download=0 serves the file inline instead of as an attachment.
+    """
     visualization = Visualization.query.get_or_404(viz_id)
-    return jsonify(visualization.to_dict())
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unsupported export format: {fmt}'}), 400
+
+    max_dimension = current_app.config.get('EXPORT_MAX_DIMENSION', 4000)
+    try:
+        width = request.args.get('width', type=int) if fmt != 'html' else None
+        height = request.args.get('height', type=int) if fmt != 'html' else None
+        scale = request.args.get('scale', type=float) if fmt == 'png' else None
+        if any(value is not None and not 0 < value <= max_dimension for value in (width, height)):
+            raise ValueError(f'width and height must be between 1 and {max_dimension}')
+        if scale is not None and not 0 < scale <= 10:
+            raise ValueError('scale must be between 0 and 10')
+        export_name = export_renderer.export(viz_id, visualization.config, fmt, export_options(width, height, scale))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RenderTimeout:
+        response = jsonify({'error': 'Export is still rendering, please retry shortly'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    except Exception as e:
+        return jsonify({'error': f'Export failed: {str(e)}'}), 500
+
+    return send_from_directory(
+        export_renderer.directory,
+        export_name,
+        mimetype=EXPORT_FORMATS[fmt],
+        as_attachment=request.args.get('download', '1') != '0',
+        download_name=f"{secure_filename(visualization.name) or 'visualization'}.{fmt}"
+    )
+
+@viz_bp.route('/report', methods=['GET'])
+def visualization_report():
+    """
+    Download one self-contained HTML report of several saved visualizations.
+    Query parameters: ids (comma-separated, in report order) and/or tag,
+    plus an optional title; ?download=0 serves the report inline.
+    """
+    try:
+        ids = parse_ids(request.args.get('ids'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    tag = request.args.get('tag')
+    if not ids and not tag:
+        return jsonify({'error': 'Pass ids and/or tag to select visualizations'}), 400
+
+    visualizations = select_visualizations(ids, tag)
+    if not visualizations:
+        return jsonify({'error': 'No visualizations matched'}), 404
+
+    title = request.args.get('title', 'Visualization report')
+    try:
+        html, _ = build_report(visualizations, title)
+    except Exception as e:
+        return jsonify({'error': f'Report failed: {str(e)}'}), 500
+
+    response = current_app.response_class(html, mimetype='text/html')
+    if request.args.get('download', '1') != '0':
+        response.headers['Content-Disposition'] = f"attachment; filename={secure_filename(title) or 'report'}.html"
+    return response
 
 @viz_bp.route('/<int:viz_id>', methods=['DELETE'])
 def delete_visualization(viz_id):
@@ -432,15 +1195,21 @@ def delete_visualization(viz_id):
     try:
         db.session.delete(visualization)
         db.session.commit()
+        dashboard_cache.invalidate()
+        export_renderer.remove(viz_id)
+        remove_thumbnails(thumbnail_directory(current_app), viz_id)
         return jsonify({'success': True, 'message': 'Visualization deleted successfully'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @viz_bp.route('/list', methods=['GET'])
+@conditional(visualization_list_etag)
 def list_visualizations():
     """Get all saved visualizations"""
     visualizations = Visualization.query.order_by(Visualization.updated_at.desc()).all()
     return jsonify({
-        'visualizations': [viz.to_dict() for viz in visualizations]
+        'visualizations': [
+            dict(viz.to_dict(), thumbnail_url=thumbnail_url(viz.thumbnail)) for viz in visualizations
+        ]
     })
@@ -0,0 +1,228 @@
+"""Small SVG thumbnails of saved figures for list and dashboard cards"""
+
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+from html import escape
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WIDTH = 320
+HEIGHT = 180
+PADDING = 8
+MAX_POINTS = 50  # Points drawn per trace; thumbnails only need the shape
+HISTOGRAM_BINS = 20
+DEFAULT_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
+
+
+def thumbnail_directory(app) -> str:
+    """Directory the thumbnails are written to, served under /static"""
+    return app.config.get('THUMBNAIL_FOLDER') or os.path.join(app.static_folder, 'thumbnails')
+
+
+def thumbnail_filename(viz_id: int, config: str) -> str:
+    """Thumbnail name from the viz id and a hash of its config, so edits change the URL"""
+    return f"viz-{viz_id}-{hashlib.sha256(config.encode()).hexdigest()[:16]}.svg"
+
+
+def _values(value: Any) -> List[Any]:
+    """A trace array as a list, decoding {dtype, bdata} typed arrays"""
+    if isinstance(value, dict) and 'bdata' in value:
+        return np.frombuffer(base64.b64decode(value['bdata']), dtype=value.get('dtype', 'f8')).tolist()
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return []
+
+
+def _numbers(values: Sequence[Any]) -> List[Optional[float]]:
+    """Values as floats, None for anything non-numeric or non-finite"""
+    numbers = []
+    for value in values:
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = None
+        numbers.append(number if number is not None and math.isfinite(number) else None)
+    return numbers
+
+
+def _thin(values: List[Any]) -> List[Any]:
+    """At most MAX_POINTS evenly spaced values"""
+    if len(values) <= MAX_POINTS:
+        return values
+    step = (len(values) - 1) / (MAX_POINTS - 1)
+    return [values[round(i * step)] for i in range(MAX_POINTS)]
+
+
+class _Canvas:
+    """Maps data coordinates onto the thumbnail, across all traces"""
+
+    def __init__(self, xs: List[float], ys: List[float]):
+        self.x0, self.x1 = (min(xs), max(xs)) if xs else (0.0, 1.0)
+        self.y0, self.y1 = (min(min(ys), 0.0), max(ys)) if ys else (0.0, 1.0)
+
+    def x(self, value: float) -> float:
+        span = self.x1 - self.x0 or 1.0
+        return PADDING + (value - self.x0) / span * (WIDTH - 2 * PADDING)
+
+    def y(self, value: float) -> float:
+        span = self.y1 - self.y0 or 1.0
+        return HEIGHT - PADDING - (value - self.y0) / span * (HEIGHT - 2 * PADDING)
+
+
+def _series(trace: Dict[str, Any]) -> List[tuple]:
+    """(x, y) pairs of a cartesian trace, categories placed at their index"""
+    ys = _numbers(_values(trace.get('y')))
+    raw_x = _values(trace.get('x'))
+    xs = _numbers(raw_x) if raw_x else [float(i) for i in range(len(ys))]
+    if raw_x and all(x is None for x in xs):
+        xs = [float(i) for i in range(len(raw_x))]
+    if trace.get('orientation') == 'h':
+        xs, ys = ys, xs
+    return _thin([(x, y) for x, y in zip(xs, ys) if x is not None and y is not None])
+
+
+def _histogram(trace: Dict[str, Any]) -> List[tuple]:
+    """Bin a histogram trace's values into (bin index, count) pairs"""
+    values = [v for v in _numbers(_values(trace.get('x') or trace.get('y'))) if v is not None]
+    if not values:
+        return []
+    counts, _ = np.histogram(values, bins=HISTOGRAM_BINS)
+    return [(float(i), float(count)) for i, count in enumerate(counts)]
+
+
+def _pie(trace: Dict[str, Any], colors: List[str]) -> List[str]:
+    """Wedges of a pie trace"""
+    values = [v for v in _numbers(_values(trace.get('values'))) if v is not None and v > 0][:MAX_POINTS]
+    total = sum(values)
+    if not total:
+        return []
+    cx, cy, r = WIDTH / 2, HEIGHT / 2, HEIGHT / 2 - PADDING
+    shapes, angle = [], -math.pi / 2
+    for i, value in enumerate(values):
+        sweep = value / total * 2 * math.pi
+        end = angle + sweep
+        large = 1 if sweep > math.pi else 0
+        if len(values) == 1:
+            shapes.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{r:.1f}" fill="{colors[0]}"/>')
+            break
+        shapes.append(
+            f'<path d="M{cx:.1f},{cy:.1f} L{cx + r * math.cos(angle):.1f},{cy + r * math.sin(angle):.1f} '
+            f'A{r:.1f},{r:.1f} 0 {large} 1 {cx + r * math.cos(end):.1f},{cy + r * math.sin(end):.1f} Z" '
+            f'fill="{colors[i % len(colors)]}"/>'
+        )
+        angle = end
+    return shapes
+
+
+def _color(trace: Dict[str, Any], index: int, colors: List[str]) -> str:
+    """A trace's marker/line colour when it is a single colour, else the palette's"""
+    for key in ('marker', 'line'):
+        color = (trace.get(key) or {}).get('color')
+        if isinstance(color, str):
+            return escape(color)
+    return colors[index % len(colors)]
+
+
+def render_thumbnail(figure: Dict[str, Any], colors: Optional[List[str]] = None) -> str:
+    """
+    Draw a small, axis-free SVG sketch of a figure: lines and points for
+    scatter traces, bars for bar and histogram traces, wedges for pies, and
+    the chart type's name for anything else.
+    """
+    colors = [escape(c) for c in (colors or DEFAULT_COLORS)]
+    traces = [t for t in figure.get('data', []) if isinstance(t, dict)]
+    shapes: List[str] = []
+
+    if traces and traces[0].get('type') == 'pie':
+        shapes = _pie(traces[0], colors)
+    else:
+        drawn = []
+        for trace in traces:
+            kind = trace.get('type', 'scatter')
+            if kind in ('scatter', 'scattergl', 'bar'):
+                drawn.append((trace, kind, _series(trace)))
+            elif kind == 'histogram':
+                drawn.append((trace, 'bar', _histogram(trace)))
+        points = [p for _, _, series in drawn for p in series]
+        canvas = _Canvas([x for x, _ in points], [y for _, y in points])
+        bars = [series for _, kind, series in drawn if kind == 'bar' and series]
+        if bars:
+            # Leave half a slot either side so the outer bars are not clipped
+            slots = max(len(series) for series in bars)
+            pad = (canvas.x1 - canvas.x0) / max(slots - 1, 1) / 2 or 0.5
+            canvas.x0, canvas.x1 = canvas.x0 - pad, canvas.x1 + pad
+            width = max((WIDTH - 2 * PADDING) / (slots * len(bars)) * 0.8, 1.0)
+        bar_index = 0
+        for i, (trace, kind, series) in enumerate(drawn):
+            color = _color(trace, i, colors)
+            if kind == 'bar' and series:
+                base = canvas.y(0.0)
+                offset = (bar_index - len(bars) / 2) * width
+                for x, y in series:
+                    top = canvas.y(y)
+                    shapes.append(
+                        f'<rect x="{canvas.x(x) + offset:.1f}" y="{min(top, base):.1f}" '
+                        f'width="{width:.1f}" height="{abs(base - top):.1f}" fill="{color}"/>'
+                    )
+                bar_index += 1
+            elif 'lines' in trace.get('mode', 'lines'):
+                path = ' '.join(f'{canvas.x(x):.1f},{canvas.y(y):.1f}' for x, y in series)
+                shapes.append(f'<polyline points="{path}" fill="none" stroke="{color}" stroke-width="2"/>')
+            else:
+                shapes.extend(
+                    f'<circle cx="{canvas.x(x):.1f}" cy="{canvas.y(y):.1f}" r="2.5" fill="{color}"/>'
+                    for x, y in series
+                )
+
+    if not shapes:
+        label = escape(str(traces[0].get('type', 'chart')) if traces else 'empty')
+        shapes.append(
+            f'<text x="{WIDTH / 2}" y="{HEIGHT / 2}" text-anchor="middle" dominant-baseline="middle" '
+            f'font-family="sans-serif" font-size="16" fill="#9ca3af">{label}</text>'
+        )
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+        f'viewBox="0 0 {WIDTH} {HEIGHT}"><rect width="100%" height="100%" fill="#ffffff"/>'
+        + ''.join(shapes) + '</svg>'
+    )
+
+
+def write_thumbnail(directory: str, viz_id: int, config: str, colors: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Render and store the thumbnail for a saved config. Returns the file
+    name, or None if the config could not be drawn. Thumbnails of earlier
+    configs are left in place; call remove_thumbnails once the new name is
+    committed.
+    """
+    filename = thumbnail_filename(viz_id, config)
+    path = os.path.join(directory, filename)
+    try:
+        if not os.path.exists(path):
+            svg = render_thumbnail(json.loads(config), colors)
+            os.makedirs(directory, exist_ok=True)
+            temp_path = path + '.part'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(svg)
+            os.replace(temp_path, path)
+    except Exception as e:
+        logger.warning(f"Could not draw thumbnail for visualization {viz_id}: {str(e)}")
+        return None
+    return filename
+
+
+def remove_thumbnails(directory: str, viz_id: int, keep: Optional[str] = None) -> None:
+    """Delete a visualization's thumbnails, except keep"""
+    if not os.path.isdir(directory):
+        return
+    prefix = f"viz-{viz_id}-"
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name != keep:
+            os.remove(os.path.join(directory, name))
@@ -122,7 +122,31 @@ export class FileManager {
             throw new Error(error.message || 'Upload failed');
         }
 
-        return await response.json();
+        const result = await response.json();
+        if (response.status === 202 && result.status_url) {
+            // Large files are processed in the background; wait for the job
+            return await this.waitForJob(result.status_url);
+        }
+        return result;
+    }
+
+    async waitForJob(statusUrl, intervalMs = 1000, maxAttempts = 900) {
+        // Give up after maxAttempts polls (15 minutes by default)
+        for (let attempt = 0; attempt < maxAttempts; attempt++) {
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+            if (!response.ok) {
+                throw new Error(job.error || 'Failed to check upload status');
+            }
+            if (job.status === 'succeeded') {
+                return job.result;
+            }
+            if (job.status === 'failed') {
+                throw new Error(job.error || 'Upload processing failed');
+            }
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
+        throw new Error('Upload processing is taking too long; please check back later');
     }
 
     updateUploadAreaUI(status, filename) {